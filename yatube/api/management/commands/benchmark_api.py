@@ -0,0 +1,91 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from core.benchmark import call_wsgi, summarize
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Страница HTML -> её JSON-двойник и нужные им аргументы URL.
+PAIRS = (
+    ('posts:index', 'api:posts', ()),
+    ('posts:group_list', 'api:group_posts', ('slug',)),
+    ('posts:profile', 'api:profile', ('username',)),
+    ('posts:post_detail', 'api:post_detail', ('post_id',)),
+)
+
+
+def measure(application, url, requests, warmup):
+    for _ in range(warmup):
+        call_wsgi(application, url)
+    runs = [call_wsgi(application, url) for _ in range(requests)]
+    total = sum(run.duration for run in runs)
+    return {
+        'url': url,
+        'status': runs[-1].status_code,
+        'queries': max(run.queries for run in runs),
+        'bytes': len(runs[-1].body),
+        'rps': round(len(runs) / total, 1) if total else None,
+        **summarize(run.duration for run in runs),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Сравнить задержку и пропускную способность JSON API '
+            'с HTML-страницами тех же лент.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Сколько раз запросить каждую страницу.')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--fields',
+                            help='Параметр ?fields= для запросов к API.')
+        parser.add_argument('--output', default='-',
+                            help='Файл для JSON, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+
+        post = Post.objects.select_related('author', 'group').first()
+        if post is None:
+            raise CommandError('В базе нет постов, запустите seed_posts.')
+        group = post.group or Group.objects.first()
+        kwargs = {
+            'slug': group.slug if group else 'none',
+            'username': post.author.username,
+            'post_id': post.pk,
+        }
+        query = f'?fields={options["fields"]}' if options['fields'] else ''
+        results = {}
+        for html_name, api_name, names in PAIRS:
+            args = {name: kwargs[name] for name in names}
+            html = measure(application, reverse(html_name, kwargs=args),
+                           options['requests'], options['warmup'])
+            api = measure(application,
+                          reverse(api_name, kwargs=args) + query,
+                          options['requests'], options['warmup'])
+            speedup = None
+            if html['rps'] and api['rps']:
+                speedup = round(api['rps'] / html['rps'], 2)
+            results[api_name] = {'html': html, 'api': api,
+                                 'speedup': speedup}
+        report = {
+            'dataset': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'posts': Post.objects.count(),
+            },
+            'requests': options['requests'],
+            'fields': options['fields'],
+            'results': results,
+        }
+        text = json.dumps(report, indent=2, sort_keys=True,
+                          ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(text + '\n')
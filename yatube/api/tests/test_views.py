@@ -0,0 +1,153 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import QueryBudgetTestMixin
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ApiViewsTest(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='api-author',
+                                              first_name='Лев',
+                                              last_name='Толстой')
+        cls.group = Group.objects.create(title='Группа API', slug='api',
+                                         description='Описание')
+        now = timezone.now()
+        cls.posts = []
+        for i in range(25):
+            post = Post.objects.create(text=f'Пост {i}', author=cls.author,
+                                       group=cls.group if i % 2 else None)
+            # Половина постов с одинаковым временем: курсор различает
+            # их по id.
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(minutes=i // 2))
+            cls.posts.append(post)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def get_json(self, url, status=200, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, status)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return json.loads(response.content)
+
+    def walk(self, url):
+        results = []
+        while url:
+            data = self.get_json(url)
+            results.extend(data['results'])
+            url = data['next']
+        return results
+
+    def test_cursor_walks_every_post_once(self):
+        """Курсор проходит все посты ровно один раз в порядке ленты."""
+        ids = [post['id'] for post in self.walk(reverse('api:posts'))]
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_previous_returns_to_first_page(self):
+        first = self.get_json(reverse('api:posts'))
+        self.assertIsNone(first['previous'])
+        second = self.get_json(first['next'])
+        back = self.get_json(second['previous'])
+        self.assertEqual(back['results'], first['results'])
+
+    def test_sparse_fieldset(self):
+        """?fields= оставляет в ответе только запрошенные поля."""
+        data = self.get_json(reverse('api:posts') + '?fields=id,author')
+        first = Post.objects.order_by('-pub_date', '-id').first()
+        self.assertEqual(data['results'][0],
+                         {'id': first.id, 'author': 'api-author'})
+        data = self.get_json(reverse('api:posts') + '?fields=text')
+        self.assertEqual(set(data['results'][0]), {'text'})
+        self.assertEqual(len(self.walk(data['next'])), 15)
+
+    def test_bad_request(self):
+        self.get_json(reverse('api:posts') + '?fields=password', status=400)
+        self.get_json(reverse('api:posts') + '?cursor=garbage', status=400)
+        response = self.client.post(reverse('api:posts'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_group_and_profile(self):
+        data = self.get_json(reverse('api:group_posts',
+                                     kwargs={'slug': 'api'}))
+        self.assertEqual(data['group']['title'], 'Группа API')
+        self.assertEqual(data['group']['posts_count'], 12)
+        self.assertTrue(all(post['group'] == 'api'
+                            for post in data['results']))
+        data = self.get_json(reverse('api:profile',
+                                     kwargs={'username': 'api-author'}))
+        self.assertEqual(data['author'], {'username': 'api-author',
+                                          'full_name': 'Лев Толстой',
+                                          'posts_count': 25})
+
+    def test_post_detail(self):
+        post = self.posts[1]
+        data = self.get_json(reverse('api:post_detail',
+                                     kwargs={'post_id': post.id}))
+        self.assertEqual(data['text'], post.text)
+        self.assertEqual(data['group'], 'api')
+        self.assertEqual(set(data), {'id', 'text', 'pub_date', 'author',
+                                     'group'})
+
+    def test_not_found_is_json(self):
+        for url in (reverse('api:group_posts', kwargs={'slug': 'nope'}),
+                    reverse('api:profile', kwargs={'username': 'nope'}),
+                    reverse('api:post_detail', kwargs={'post_id': 10**6})):
+            with self.subTest(url=url):
+                self.assertIn('detail', self.get_json(url, status=404))
+
+    def test_conditional_get(self):
+        """Повторный запрос с ETag получает 304 без тела."""
+        url = reverse('api:posts') + '?fields=id'
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_views_stay_within_budget(self):
+        urls = (
+            reverse('api:posts'),
+            reverse('api:group_posts', kwargs={'slug': 'api'}),
+            reverse('api:profile', kwargs={'username': 'api-author'}),
+            reverse('api:post_detail', kwargs={'post_id': self.posts[0].id}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                # Первый запрос заводит отметки лент, бюджет — для
+                # последующих.
+                self.client.get(url + '?fields=id')
+                self.assertQueryBudget(self.client.get(url))
+
+
+class BenchmarkApiCommandTest(TestCase):
+    def test_reports_html_and_api(self):
+        """benchmark_api сравнивает каждую ленту с её JSON-двойником."""
+        call_command('seed_posts', users=5, groups=2, posts=30,
+                     seed=3, stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_api', requests=2, warmup=0,
+                     fields='id,text', stdout=out)
+        results = json.loads(out.getvalue())['results']
+        self.assertEqual(set(results), {'api:posts', 'api:group_posts',
+                                        'api:profile', 'api:post_detail'})
+        for result in results.values():
+            self.assertEqual(result['html']['status'], 200)
+            self.assertEqual(result['api']['status'], 200)
+            self.assertIsNotNone(result['speedup'])
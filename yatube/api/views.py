@@ -0,0 +1,135 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from core.paginator import CursorPaginator, InvalidCursor
+from core.utils import CURSOR_PARAM
+from posts.feeds import (feed_page, group_feed, index_feed, post_detail_feeds,
+                         profile_feed)
+from posts.models import Group, Post, User, author_posts_count
+
+# Поле ответа -> выражение для values(): автор и группа приходят
+# одним JOIN, без создания моделей.
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+# Ключ курсора выбирается всегда, даже если клиент его не запросил.
+CURSOR_FIELDS = ('id', 'pub_date')
+FIELDS_PARAM = 'fields'
+
+
+class BadRequest(Exception):
+    pass
+
+
+def error(detail, status):
+    return JsonResponse({'detail': detail}, status=status,
+                        json_dumps_params={'ensure_ascii': False})
+
+
+def requested_fields(request):
+    """Поля поста из ?fields=id,text; без параметра — все."""
+    raw = request.GET.get(FIELDS_PARAM)
+    if not raw:
+        return list(POST_FIELDS)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in POST_FIELDS]
+    if unknown or not fields:
+        raise BadRequest('Неизвестные поля: {}. Доступны: {}.'.format(
+            ', '.join(unknown) or '—', ', '.join(POST_FIELDS)))
+    return fields
+
+
+def post_values(queryset, fields):
+    lookups = {POST_FIELDS[field] for field in fields}
+    return queryset.values(*lookups.union(CURSOR_FIELDS))
+
+
+def serialize(row, fields):
+    return {field: row[POST_FIELDS[field]] for field in fields}
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query[CURSOR_PARAM] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+def post_list(request, queryset, **extra):
+    """Страница постов по курсору в виде JSON."""
+    fields = requested_fields(request)
+    paginator = CursorPaginator(post_values(queryset, fields),
+                                settings.POSTS_SHOWN)
+    try:
+        page = paginator.page(request.GET.get(CURSOR_PARAM))
+    except InvalidCursor:
+        raise BadRequest('Неверный курсор.')
+    return JsonResponse({
+        **extra,
+        'results': [serialize(row, fields) for row in page],
+        'next': page_url(request, page.next_cursor),
+        'previous': page_url(request, page.previous_cursor),
+    }, json_dumps_params={'ensure_ascii': False})
+
+
+def api_view(view):
+    """GET/HEAD и ошибки запроса в виде JSON вместо HTML-страниц."""
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as exc:
+            return error(str(exc), 400)
+    return wrapper
+
+
+@api_view
+@feed_page(lambda request: [index_feed()])
+def posts(request):
+    return post_list(request, Post.objects.all())
+
+
+@api_view
+@feed_page(lambda request, slug: [group_feed(slug)])
+def group_posts(request, slug):
+    group = (Group.objects.filter(slug=slug)
+             .values('id', 'title', 'slug', 'description', 'posts_count')
+             .first())
+    if group is None:
+        return error('Группа не найдена.', 404)
+    posts = Post.objects.filter(group_id=group.pop('id'))
+    return post_list(request, posts, group=group)
+
+
+@api_view
+@feed_page(lambda request, username: [profile_feed(username)])
+def profile(request, username):
+    author = (User.objects.select_related('post_counter')
+              .filter(username=username).first())
+    if author is None:
+        return error('Автор не найден.', 404)
+    return post_list(request, Post.objects.filter(author=author), author={
+        'username': author.username,
+        'full_name': author.get_full_name(),
+        'posts_count': author_posts_count(author),
+    })
+
+
+@api_view
+@feed_page(post_detail_feeds)
+def post_detail(request, post_id):
+    fields = requested_fields(request)
+    row = post_values(Post.objects.filter(pk=post_id), fields).first()
+    if row is None:
+        return error('Пост не найден.', 404)
+    return JsonResponse(serialize(row, fields),
+                        json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,159 @@
+import bisect
+import http.client
+import io
+import math
+import time
+from collections import Counter
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth import SESSION_KEY
+from django.utils.module_loading import import_string
+
+from .sql_budget import record_queries
+
+
+def percentile(values, percent):
+    """Процентиль по ближайшему рангу; values должны быть отсортированы."""
+    if not values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(durations):
+    """p50/p95/p99, минимум и максимум в миллисекундах."""
+    values = sorted(duration * 1000 for duration in durations)
+    return {
+        'count': len(values),
+        'min_ms': round(values[0], 3) if values else None,
+        'p50_ms': round(percentile(values, 50), 3) if values else None,
+        'p95_ms': round(percentile(values, 95), 3) if values else None,
+        'p99_ms': round(percentile(values, 99), 3) if values else None,
+        'max_ms': round(values[-1], 3) if values else None,
+    }
+
+
+# Верхние границы корзин гистограммы задержек, мс.
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000,
+                       5000)
+
+
+def histogram(durations, bounds=HISTOGRAM_BOUNDS_MS):
+    """Число запросов по корзинам задержки, только непустые корзины."""
+    labels = [f'<={bound}ms' for bound in bounds] + [f'>{bounds[-1]}ms']
+    counts = Counter(labels[bisect.bisect_left(bounds, duration * 1000)]
+                     for duration in durations)
+    return {label: counts[label] for label in labels if counts[label]}
+
+
+def session_cookie(user):
+    """Cookie сессии вошедшего пользователя, как после логина."""
+    engine = import_string(settings.SESSION_ENGINE)
+    session = engine.SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+
+class WSGIResult:
+    def __init__(self, status, headers, body, duration, queries):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.duration = duration
+        self.queries = queries
+
+    @property
+    def status_code(self):
+        return int(self.status.split()[0])
+
+    @property
+    def cookies(self):
+        """Cookie из заголовков Set-Cookie: {имя: значение}."""
+        jar = SimpleCookie()
+        for name, value in self.headers:
+            if name.lower() == 'set-cookie':
+                jar.load(value)
+        return {name: morsel.value for name, morsel in jar.items()}
+
+
+def call_wsgi(application, path, method='GET', cookie=None, body=b'',
+              content_type=None, extra=None):
+    """Выполнить запрос напрямую через WSGI-приложение и замерить его."""
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+    if content_type:
+        environ['CONTENT_TYPE'] = content_type
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    environ.update(extra or {})
+    setup_testing_defaults(environ)
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = status
+        started['headers'] = headers
+
+    with record_queries() as report:
+        start = time.perf_counter()
+        response = application(environ, start_response)
+        try:
+            body = b''.join(response)
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        duration = time.perf_counter() - start
+    return WSGIResult(started['status'], started['headers'], body,
+                      duration, report.count)
+
+
+class HTTPSession:
+    """Посетитель сайта по настоящему HTTP: хранит свои cookie."""
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookies = {}
+
+    def request(self, method, path, data=None):
+        headers = {}
+        body = None
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items())
+        if data is not None:
+            body = urlencode(data).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        connection = http.client.HTTPConnection(self.host, self.port,
+                                                timeout=self.timeout)
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            content = response.read()
+        finally:
+            connection.close()
+        result = WSGIResult(f'{response.status} {response.reason}',
+                            response.getheaders(), content,
+                            time.perf_counter() - start, None)
+        for name, value in result.cookies.items():
+            # Удалённая cookie приходит с пустым значением.
+            if value:
+                self.cookies[name] = value
+            else:
+                self.cookies.pop(name, None)
+        return result
@@ -0,0 +1,62 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+_state = threading.local()
+
+
+def replicas_enabled():
+    """Можно ли сейчас читать с реплик.
+
+    По умолчанию нельзя: команды, воркеры и оболочка видят свои записи
+    сразу. Чтение с реплик включает ReplicaRoutingMiddleware для
+    безопасных запросов.
+    """
+    return getattr(_state, 'replicas', False)
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    previous = replicas_enabled()
+    _state.replicas = enabled
+    try:
+        yield
+    finally:
+        _state.replicas = previous
+
+
+def use_primary():
+    """Читать с основной базы внутри блока, например сразу после записи."""
+    return use_replicas(False)
+
+
+class PrimaryReplicaRouter:
+    """Запись — в основную базу, чтение — на случайную реплику.
+
+    Реплики перечислены в DATABASE_REPLICAS; без них и вне
+    use_replicas() всё идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replicas_enabled():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема попадает на реплики вместе с данными.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,100 @@
+import json
+import statistics
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlquote, urlsafe_base64_encode
+
+from core.benchmark import call_wsgi, session_cookie, summarize
+from posts.models import Group, Post
+
+User = get_user_model()
+
+NAMESPACES = ('posts', 'users', 'about')
+
+
+def named_patterns(resolver=None, namespace=None):
+    """Имена URL вида 'posts:index' из выбранных пространств имён."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in NAMESPACES:
+                yield from named_patterns(pattern, pattern.namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name and namespace:
+            yield f'{namespace}:{pattern.name}', pattern
+
+
+class Command(BaseCommand):
+    help = ('Прогнать все страницы posts, users и about через WSGI и '
+            'вывести задержки, число запросов и размер ответа в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Сколько раз запросить каждую страницу.')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--output', default='-',
+                            help='Файл для JSON, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+
+        post = Post.objects.select_related('author', 'group').first()
+        if post is None:
+            raise CommandError('В базе нет постов, запустите seed_posts.')
+        group = post.group or Group.objects.first()
+        user = post.author
+        kwargs = {
+            'slug': group.slug if group else 'none',
+            'username': user.username,
+            'post_id': post.pk,
+            'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+            'token': default_token_generator.make_token(user),
+        }
+        login_url = reverse(settings.LOGIN_URL)
+        cookie = session_cookie(user)
+        results = {}
+        for name, pattern in named_patterns():
+            args = {key: kwargs[key] for key in pattern.pattern.converters
+                    if key in kwargs}
+            url = reverse(name, kwargs=args)
+            if name == 'posts:search':
+                url += '?q=' + urlquote(post.text.split()[0])
+            probe = call_wsgi(application, url)
+            # Закрытые страницы запрашиваем от имени автора поста.
+            page_cookie = None
+            location = dict(probe.headers).get('Location', '')
+            if probe.status_code == 302 and location.startswith(login_url):
+                page_cookie = cookie
+            for _ in range(options['warmup']):
+                call_wsgi(application, url, cookie=page_cookie)
+            runs = [call_wsgi(application, url, cookie=page_cookie)
+                    for _ in range(options['requests'])]
+            results[name] = {
+                'url': url,
+                'authenticated': page_cookie is not None,
+                'status': runs[-1].status_code,
+                'queries': max(run.queries for run in runs),
+                'bytes': int(statistics.median(len(run.body)
+                                               for run in runs)),
+                **summarize(run.duration for run in runs),
+            }
+        report = {
+            'dataset': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'posts': Post.objects.count(),
+            },
+            'requests': options['requests'],
+            'results': results,
+        }
+        text = json.dumps(report, indent=2, sort_keys=True,
+                          ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(text + '\n')
@@ -0,0 +1,94 @@
+import json
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine
+from django.urls import reverse
+
+from core.url_cache import cached_reverse
+
+# Ссылки, которые строит одна страница ленты: карточки и шапка.
+ROUTES = (
+    ('posts:index', {}),
+    ('posts:profile', {'username': 'leo'}),
+    ('posts:post_detail', {'post_id': 12345}),
+    ('posts:group_list', {'slug': 'cats'}),
+    ('users:login', {}),
+    ('about:author', {}),
+)
+
+FEED = """
+{% for post in posts %}
+  <a href="{% url 'posts:profile' post.author %}">{{ post.author }}</a>
+  <a href="{% url 'posts:post_detail' post.id %}">#{{ post.id }}</a>
+  <a href="{% url 'posts:group_list' post.group %}">{{ post.group }}</a>
+{% endfor %}
+<a href="{% url 'posts:index' %}"></a>
+<a href="{% url 'about:author' %}"></a>
+<a href="{% url 'about:tech' %}"></a>
+<a href="{% url 'posts:search' %}"></a>
+<a href="{% url 'users:login' %}"></a>
+<a href="{% url 'users:signup' %}"></a>
+"""
+
+
+def per_call_us(function, number, repeat):
+    """Лучшее из repeat прогонов, в микросекундах на вызов."""
+    best = min(timeit.repeat(function, number=number, repeat=repeat))
+    return round(best / number * 1e6, 3)
+
+
+def compare(stock, cached, number, repeat):
+    stock_us = per_call_us(stock, number, repeat)
+    cached_us = per_call_us(cached, number, repeat)
+    return {
+        'reverse_us': stock_us,
+        'cached_us': cached_us,
+        'speedup': round(stock_us / cached_us, 2) if cached_us else None,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Сравнить стандартный reverse() и {% url %} с запомненными '
+            'маршрутами из core.url_cache.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=2000,
+                            help='Вызовов в одном прогоне.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=10,
+                            help='Карточек в шаблоне ленты.')
+        parser.add_argument('--output', default='-',
+                            help='Файл для JSON, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        number, repeat = options['number'], options['repeat']
+        results = {}
+        for name, kwargs in ROUTES:
+            if reverse(name, kwargs=kwargs) != cached_reverse(
+                    name, kwargs=kwargs):
+                raise AssertionError(f'{name}: URL не совпадают')
+            results[name] = compare(
+                lambda: reverse(name, kwargs=kwargs),
+                lambda: cached_reverse(name, kwargs=kwargs),
+                number, repeat)
+        context = Context({'posts': [
+            {'id': pk, 'author': f'author{pk}', 'group': f'group{pk}'}
+            for pk in range(1, options['posts'] + 1)]})
+        stock = Engine().from_string(FEED)
+        cached = Engine(
+            builtins=['core.templatetags.cached_url']).from_string(FEED)
+        if stock.render(context) != cached.render(context):
+            raise AssertionError('Шаблоны отрисованы по-разному')
+        results['template'] = compare(
+            lambda: stock.render(context), lambda: cached.render(context),
+            max(number // 100, 1), repeat)
+        report = {'number': number, 'posts': options['posts'],
+                  'results': results}
+        text = json.dumps(report, indent=2, sort_keys=True,
+                          ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(text + '\n')
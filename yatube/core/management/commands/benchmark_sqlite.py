@@ -0,0 +1,172 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from django.urls import reverse
+
+from core.benchmark import call_wsgi, session_cookie, summarize
+from posts.models import Post
+
+User = get_user_model()
+
+MARKER = '[benchmark_sqlite]'
+
+# Как SQLite работает «из коробки»: журнал отката, полная синхронизация,
+# новое соединение на каждый запрос и ни одного повтора записи.
+PROFILES = {
+    'baseline': {
+        'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+        'conn_max_age': 0,
+        'retries': 1,
+    },
+    'tuned': {},
+}
+
+
+def reader_urls(post):
+    return [
+        reverse('posts:index'),
+        reverse('posts:profile', args=[post.author.username]),
+        reverse('posts:post_detail', args=[post.pk]),
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Нагрузить SQLite читателями лент и авторами post_create '
+            'одновременно и сравнить исходные настройки с WAL-профилем.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=10,
+                            help='Сколько секунд длится каждый прогон.')
+        parser.add_argument('--profile', action='append',
+                            choices=sorted(PROFILES),
+                            help='Какие профили запускать; по умолчанию '
+                                 'все.')
+        parser.add_argument('--output', default='-',
+                            help='Файл для JSON, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+
+        post = Post.objects.select_related('author').first()
+        if post is None:
+            raise CommandError('В базе нет постов, запустите seed_posts.')
+        authors = list(User.objects.order_by('pk')[:options['writers']])
+        results = {}
+        try:
+            for name in options['profile'] or sorted(PROFILES):
+                results[name] = self.run_profile(
+                    application, PROFILES[name], reader_urls(post),
+                    authors, options)
+        finally:
+            Post.objects.filter(text__startswith=MARKER).delete()
+        report = {
+            'readers': options['readers'],
+            'writers': len(authors),
+            'duration': options['duration'],
+            'results': results,
+        }
+        if {'baseline', 'tuned'} <= results.keys():
+            before = results['baseline']['rps']
+            report['speedup'] = (round(results['tuned']['rps'] / before, 2)
+                                 if before else None)
+        text = json.dumps(report, indent=2, sort_keys=True,
+                          ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(text + '\n')
+
+    def run_profile(self, application, profile, urls, authors, options):
+        database = connections.databases[DEFAULT_DB_ALIAS]
+        conn_max_age = database['CONN_MAX_AGE']
+        overrides = {
+            'SQLITE_PRAGMAS': profile.get('pragmas',
+                                          settings.SQLITE_PRAGMAS),
+            'SQLITE_WRITE_RETRIES': profile.get(
+                'retries', settings.SQLITE_WRITE_RETRIES),
+        }
+        # Новые прагмы применяются только к новым соединениям.
+        connections.close_all()
+        database['CONN_MAX_AGE'] = profile.get('conn_max_age',
+                                               conn_max_age)
+        try:
+            with override_settings(**overrides):
+                return self.load(application, urls, authors, options)
+        finally:
+            database['CONN_MAX_AGE'] = conn_max_age
+            connections.close_all()
+
+    def load(self, application, urls, authors, options):
+        samples = {'read': [], 'write': []}
+        statuses = Counter()
+        lock = threading.Lock()
+        writers = [self.writer_cookie(application, author)
+                   for author in authors]
+        deadline = time.monotonic() + options['duration']
+
+        def worker(kind, cookie=None):
+            try:
+                while time.monotonic() < deadline:
+                    if kind == 'read':
+                        result = call_wsgi(application, random.choice(urls))
+                    else:
+                        result = self.create_post(application, *cookie)
+                    with lock:
+                        samples[kind].append(result.duration)
+                        statuses[result.status_code] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=('read',))
+                   for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=('write', cookie))
+                    for cookie in writers]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        total = len(samples['read']) + len(samples['write'])
+        errors = sum(count for status, count in statuses.items()
+                     if status >= 500)
+        return {
+            'requests': total,
+            'rps': round(total / elapsed, 1) if elapsed else None,
+            'writes_per_second': round(len(samples['write']) / elapsed, 1),
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else None,
+            'statuses': {str(status): count
+                         for status, count in sorted(statuses.items())},
+            'read': summarize(samples['read']),
+            'write': summarize(samples['write']),
+        }
+
+    def writer_cookie(self, application, author):
+        """Cookie сессии и CSRF-токен, как у автора в браузере."""
+        cookie = session_cookie(author)
+        page = call_wsgi(application, reverse('posts:post_create'),
+                         cookie=cookie)
+        token = page.cookies[settings.CSRF_COOKIE_NAME]
+        return f'{cookie}; {settings.CSRF_COOKIE_NAME}={token}', token
+
+    def create_post(self, application, cookie, token):
+        body = urlencode({
+            'text': f'{MARKER} {time.time()}',
+            'csrfmiddlewaretoken': token,
+        }).encode()
+        return call_wsgi(application, reverse('posts:post_create'),
+                         method='POST', cookie=cookie, body=body,
+                         content_type='application/x-www-form-urlencoded')
@@ -0,0 +1,262 @@
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.core.servers.basehttp import WSGIRequestHandler
+from django.db import connections
+from django.urls import reverse
+
+from core.benchmark import HTTPSession, histogram, summarize
+from posts.models import Group, Post
+
+User = get_user_model()
+
+USER_PREFIX = 'loadtest-'
+PASSWORD = 'loadtest-Pa55word'
+MARKER = '[loadtest]'
+
+SCENARIOS = ('anon_read', 'auth_read', 'login', 'create')
+DEFAULT_MIX = 'anon_read=60,auth_read=25,login=5,create=10'
+
+
+def parse_mix(value):
+    """'anon_read=60,create=10' -> {'anon_read': 60.0, 'create': 10.0}."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise CommandError(f'Неизвестный сценарий {name!r}, есть: '
+                               f'{", ".join(SCENARIOS)}.')
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise CommandError(f'Вес сценария {name} — не число.')
+    if not any(weight > 0 for weight in mix.values()):
+        raise CommandError('Нужен хотя бы один сценарий с весом больше 0.')
+    return mix
+
+
+def read_urls(sample=20):
+    """(имя URL, адрес) страниц, которые читают посетители."""
+    posts = list(Post.objects.select_related('author').order_by('-pk')
+                 [:sample])
+    if not posts:
+        raise CommandError('В базе нет постов, запустите seed_posts.')
+    urls = [('posts:index', reverse('posts:index')),
+            ('posts:index', reverse('posts:index') + '?page=2')]
+    group = Group.objects.first()
+    if group is not None:
+        urls.append(('posts:group_list',
+                     reverse('posts:group_list', args=[group.slug])))
+    for post in posts:
+        urls.append(('posts:post_detail',
+                     reverse('posts:post_detail', args=[post.pk])))
+        urls.append(('posts:profile',
+                     reverse('posts:profile', args=[post.author.username])))
+    return urls
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LoadTestServer(ThreadedWSGIServer):
+    # Все воркеры подключаются одновременно.
+    request_queue_size = 128
+
+
+class LoadTest:
+    """Воркеры-посетители и статистика по каждому адресу."""
+
+    def __init__(self, address, mix, urls, users):
+        self.host, self.port = address
+        self.mix = mix
+        self.urls = urls
+        self.users = users
+        self.lock = threading.Lock()
+        self.durations = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+        self.deadline = None
+
+    def call(self, scenario, session, method, name, path, expected,
+             data=None):
+        """Запрос с записью задержки; ошибка — исключение или не тот код."""
+        key = f'{scenario} {method} {name}'
+        start = time.perf_counter()
+        try:
+            result = session.request(method, path, data)
+        except OSError as error:
+            status, duration = type(error).__name__, (
+                time.perf_counter() - start)
+        else:
+            status, duration = result.status_code, result.duration
+        with self.lock:
+            self.durations[key].append(duration)
+            self.statuses[key][status] += 1
+            if status != expected:
+                self.errors[key] += 1
+        return status == expected
+
+    def login(self, session, username, scenario='login'):
+        path = reverse('users:login')
+        if not self.call(scenario, session, 'GET', 'users:login', path, 200):
+            return False
+        return self.call(scenario, session, 'POST', 'users:login', path, 302, {
+            'username': username,
+            'password': PASSWORD,
+            'csrfmiddlewaretoken': session.cookies.get(
+                settings.CSRF_COOKIE_NAME, ''),
+        })
+
+    def anon_read(self, member):
+        self.call('anon_read', HTTPSession(self.host, self.port), 'GET',
+                  *random.choice(self.urls), 200)
+
+    def auth_read(self, member):
+        self.call('auth_read', member, 'GET', *random.choice(self.urls), 200)
+
+    def create(self, member):
+        self.call('create', member, 'POST', 'posts:post_create',
+                  reverse('posts:post_create'), 302, {
+                      'text': f'{MARKER} {time.time()}',
+                      'csrfmiddlewaretoken': member.cookies.get(
+                          settings.CSRF_COOKIE_NAME, ''),
+                  })
+
+    def worker(self, username):
+        # Вход перед началом замера: им живут auth_read и create.
+        member = HTTPSession(self.host, self.port)
+        if not self.login(member, username, scenario='setup'):
+            return
+        scenarios = list(self.mix)
+        weights = list(self.mix.values())
+        while time.monotonic() < self.deadline:
+            scenario = random.choices(scenarios, weights)[0]
+            if scenario == 'login':
+                self.login(HTTPSession(self.host, self.port), username)
+            else:
+                getattr(self, scenario)(member)
+
+    def run(self, workers, duration):
+        self.deadline = time.monotonic() + duration
+        threads = [
+            threading.Thread(target=self.worker,
+                             args=(self.users[number % len(self.users)],))
+            for number in range(workers)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.monotonic() - started)
+
+    def report(self, elapsed):
+        endpoints = {}
+        for key in sorted(self.durations):
+            if key.startswith('setup '):
+                continue
+            durations = self.durations[key]
+            endpoints[key] = {
+                'requests': len(durations),
+                'rps': round(len(durations) / elapsed, 1),
+                'errors': self.errors[key],
+                'error_rate': round(self.errors[key] / len(durations), 4),
+                'statuses': {str(status): count for status, count
+                             in sorted(self.statuses[key].items(),
+                                       key=lambda item: str(item[0]))},
+                'latency': summarize(durations),
+                'histogram': histogram(durations),
+            }
+        total = sum(endpoint['requests'] for endpoint in endpoints.values())
+        errors = sum(endpoint['errors'] for endpoint in endpoints.values())
+        return {
+            'elapsed': round(elapsed, 2),
+            'requests': total,
+            'rps': round(total / elapsed, 1) if elapsed else None,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else None,
+            'setup_errors': sum(count for key, count in self.errors.items()
+                                if key.startswith('setup ')),
+            'endpoints': endpoints,
+        }
+
+
+class Command(BaseCommand):
+    help = ('Поднять yatube.wsgi.application на локальном многопоточном '
+            'сервере и нагрузить его смесью сценариев: чтение гостем и '
+            'пользователем, вход и публикация поста.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Сколько посетителей работают параллельно.')
+        parser.add_argument('--duration', type=float, default=10,
+                            help='Длительность в секундах.')
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help='Веса сценариев через запятую, по '
+                                 f'умолчанию {DEFAULT_MIX}.')
+        parser.add_argument('--users', type=int, default=4,
+                            help='Сколько временных пользователей создать.')
+        parser.add_argument('--port', type=int, default=0,
+                            help='Порт сервера; 0 — любой свободный.')
+        parser.add_argument('--output', default='-',
+                            help='Файл для JSON, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+
+        mix = parse_mix(options['mix'])
+        urls = read_urls()
+        # Имена с меткой прогона не совпадут с чужими учётными записями.
+        run = secrets.token_hex(4)
+        users = []
+        try:
+            for number in range(max(options['users'], 1)):
+                users.append(self.create_user(f'{USER_PREFIX}{run}-{number}'))
+            report = self.run_load(application, mix, urls, users, options)
+        finally:
+            # Удаляются только пользователи этого прогона, а их посты —
+            # вместе с ними.
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+        report = {
+            'workers': options['workers'],
+            'duration': options['duration'],
+            'mix': mix,
+            **report,
+        }
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(text + '\n')
+
+    def run_load(self, application, mix, urls, users, options):
+        server = LoadTestServer(('127.0.0.1', options['port']),
+                                QuietHandler)
+        server.set_app(application)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            return LoadTest(server.server_address, mix, urls,
+                            [user.username for user in users]).run(
+                options['workers'], options['duration'])
+        finally:
+            server.shutdown()
+            server.server_close()
+            connections.close_all()
+
+    def create_user(self, username):
+        """Новый временный пользователь; чужие учётные записи не трогаем."""
+        if User.objects.filter(username=username).exists():
+            raise CommandError(f'Пользователь {username} уже есть.')
+        return User.objects.create_user(username=username, password=PASSWORD)
@@ -0,0 +1,37 @@
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import hottest, saved_views
+
+SORT_KEYS = ('tottime', 'cumulative', 'ncalls')
+
+
+class Command(BaseCommand):
+    help = ('Самые дорогие функции представления по всем его профилям '
+            'из PROFILING_DIR. Без аргумента — список представлений.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('view', nargs='?',
+                            help='Имя URL, например posts:index.')
+        parser.add_argument('--limit', type=int, default=20,
+                            help='Сколько функций показать.')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='tottime')
+        parser.add_argument('--last', type=int,
+                            help='Учесть только столько последних профилей.')
+
+    def handle(self, *args, **options):
+        if not options['view']:
+            for view, count in saved_views().items():
+                self.stdout.write(f'{view}\t{count}')
+            return
+        # OutputWrapper добавляет перевод строки к каждой записи,
+        # поэтому таблица pstats собирается целиком.
+        report = io.StringIO()
+        count = hottest(options['view'], options['limit'], options['sort'],
+                        options['last'], stream=report)
+        if not count:
+            raise CommandError(
+                f'Нет сохранённых профилей для {options["view"]}.')
+        self.stdout.write(report.getvalue(), ending='')
+        self.stdout.write(f'Профилей: {count}')
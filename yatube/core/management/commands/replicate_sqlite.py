@@ -0,0 +1,87 @@
+import sqlite3
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+
+
+def sqlite_path(alias):
+    config = settings.DATABASES.get(alias)
+    if config is None or config['ENGINE'] != SQLITE_ENGINE:
+        raise CommandError(f'{alias}: нужна база SQLite из DATABASES.')
+    return config['NAME']
+
+
+def snapshot(path):
+    """Согласованная копия файла SQLite в памяти."""
+    source = sqlite3.connect(path)
+    copy = sqlite3.connect(':memory:')
+    try:
+        source.backup(copy)
+    finally:
+        source.close()
+    return copy
+
+
+def apply(copy, path):
+    target = sqlite3.connect(path)
+    try:
+        copy.backup(target)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = ('Имитировать реплику: копировать основную базу SQLite в файлы '
+            'реплик из DATABASE_REPLICAS с заданной задержкой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=float, default=2.0,
+                            help='Задержка репликации в секундах.')
+        parser.add_argument('--interval', type=float, default=0.5,
+                            help='Как часто снимать копию основной базы.')
+        parser.add_argument('--once', action='store_true',
+                            help='Скопировать один раз (после --lag) и '
+                                 'выйти.')
+        parser.add_argument('--primary',
+                            help='Путь к основной базе вместо default.')
+        parser.add_argument('--replica', action='append',
+                            help='Путь к файлу реплики; можно повторять.')
+
+    def handle(self, *args, **options):
+        primary = options['primary'] or sqlite_path('default')
+        replicas = options['replica'] or [
+            sqlite_path(alias) for alias in settings.DATABASE_REPLICAS]
+        if not replicas:
+            raise CommandError('Реплики не настроены: задайте '
+                               'YATUBE_SQLITE_REPLICA=1 или --replica.')
+        pending = deque()
+        try:
+            while True:
+                pending.append((time.monotonic() + options['lag'],
+                                snapshot(primary)))
+                if options['once']:
+                    time.sleep(options['lag'])
+                self.apply_due(pending, replicas)
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def apply_due(self, pending, replicas):
+        """Применить копии, чья задержка истекла; старые уже не нужны."""
+        now = time.monotonic()
+        due = None
+        while pending and pending[0][0] <= now:
+            if due is not None:
+                due.close()
+            due = pending.popleft()[1]
+        if due is None:
+            return
+        for path in replicas:
+            apply(due, path)
+        due.close()
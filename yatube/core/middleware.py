@@ -0,0 +1,143 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .db_router import use_replicas
+from .profiling import Profile, profile_mode
+from .sql_budget import QueryBudgetExceeded, budget_for, record_queries
+from .timing import finish_request, instrument, mark, time_request
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """Считает запросы к БД на каждый HTTP-запрос и сверяет с бюджетом.
+
+    Отчёт доступен тестам как response.query_report. При нарушении
+    бюджета пишет предупреждение в лог или, если SQL_BUDGET_ACTION
+    равно 'raise', выбрасывает QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries() as report:
+            response = self.get_response(request)
+        match = request.resolver_match
+        report.url_name = match.view_name if match else None
+        response.query_report = report
+        problems = report.problems(budget_for(report.url_name))
+        if problems:
+            if settings.SQL_BUDGET_ACTION == 'raise':
+                raise QueryBudgetExceeded('\n'.join(problems))
+            for problem in problems:
+                logger.warning(problem)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Чтение с реплик для безопасных запросов, с привязкой после записи.
+
+    GET и HEAD читают с реплик. Запрос, который мог писать (POST и
+    другие), целиком идёт в основную базу и ставит cookie на
+    REPLICA_PIN_SECONDS: пока она жива, клиент читает с основной базы
+    и видит свою запись, даже если реплика отстаёт.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        safe = request.method in self.SAFE_METHODS
+        pinned = settings.REPLICA_PIN_COOKIE in request.COOKIES
+        with use_replicas(safe and not pinned):
+            response = self.get_response(request)
+        if not safe:
+            response.set_cookie(settings.REPLICA_PIN_COOKIE, '1',
+                                max_age=settings.REPLICA_PIN_SECONDS,
+                                httponly=True)
+        return response
+
+
+class ProfilingMiddleware:
+    """Профиль запроса по требованию: cProfile вокруг представления.
+
+    Внутри профиля оказываются представление, рендер шаблонов и
+    middleware ниже этого. Результат — файлы .prof и .txt в
+    PROFILING_DIR/<имя URL>/ и заголовок PROFILING_RESPONSE_HEADER
+    с именем файла. Какие запросы профилировать, решает profile_mode.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = profile_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        profile = Profile(memory=mode == 'memory')
+        with profile.run():
+            response = self.get_response(request)
+        match = request.resolver_match
+        path = profile.save(request, response,
+                            match.view_name if match else None)
+        response[settings.PROFILING_RESPONSE_HEADER] = os.path.relpath(
+            path, settings.PROFILING_DIR)
+        return response
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing и строка JSON в лог по каждому запросу.
+
+    Стоит первым в MIDDLEWARE, а парный ViewTimingMiddleware — последним:
+    вместе они делят время на middleware, поиск URL и представление.
+    Внутри представления отдельно считаются запросы к БД и собственное
+    время каждого шаблона. Строка лога пишется после отправки ответа и
+    включает ещё и её время.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        instrument()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with time_request() as timer:
+            response = self.get_response(request)
+        response['Server-Timing'] = timer.header()
+        finish_request(timer, request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Первый из process_view вызывается сразу после поиска URL.
+        mark('resolved')
+
+
+class ViewTimingMiddleware:
+    """Внутренние отметки для ServerTimingMiddleware."""
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mark('handler')
+        response = self.get_response(request)
+        mark('view_done')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mark('view')
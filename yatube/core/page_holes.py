@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+
+from django.template import loader
+
+HOLE = '<!-- hole:{} -->'
+
+
+@contextmanager
+def punch_holes(request):
+    """Рендерить {% hole %} внутри блока как метки, а не как шаблоны.
+
+    Возвращает список имён шаблонов, на месте которых остались метки:
+    страницу с метками можно кэшировать для всех пользователей, а
+    затем заполнить через fill_holes().
+    """
+    holes = request.page_holes = []
+    try:
+        yield holes
+    finally:
+        del request.page_holes
+
+
+def fill_holes(request, content, holes):
+    """Подставить в content (bytes) шаблоны, отрисованные для request."""
+    for template_name in holes:
+        html = loader.render_to_string(template_name, request=request)
+        content = content.replace(HOLE.format(template_name).encode(),
+                                  html.encode())
+    return content
@@ -0,0 +1,364 @@
+import base64
+import hashlib
+import math
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import (EmptyPage, Page, PageNotAnInteger,
+                                   Paginator)
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, pub_date, pk):
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Вернуть (direction, pub_date, pk) из непрозрачного токена."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor(token)
+    if direction not in (FORWARD, BACKWARD) or pub_date is None:
+        raise InvalidCursor(token)
+    return direction, pub_date, pk
+
+
+def row_key(row):
+    """Ключ (pub_date, id) модели или словаря из values()."""
+    if isinstance(row, dict):
+        return row['pub_date'], row['id']
+    return row.pub_date, row.pk
+
+
+class CursorPage(Sequence):
+    """Страница keyset-пагинации с интерфейсом, похожим на Page."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next() or not self.object_list:
+            return None
+        return encode_cursor(FORWARD, *row_key(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not self.object_list:
+            return None
+        return encode_cursor(BACKWARD, *row_key(self.object_list[0]))
+
+
+class CursorPaginator:
+    """Пагинация по ключу (pub_date, id) без OFFSET.
+
+    Каждая страница — один запрос с условием по ключу последней
+    показанной записи, поэтому её стоимость не зависит от глубины.
+    Подходит и для values(), если в нём есть pub_date и id.
+    """
+
+    ordering = ('-pub_date', '-id')
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._forward(self.object_list, has_previous=False)
+        direction, pub_date, pk = decode_cursor(cursor)
+        if direction == FORWARD:
+            posts = self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+            return self._forward(posts, has_previous=True)
+        posts = self.object_list.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).order_by('pub_date', 'id')
+        rows = list(posts[:self.per_page + 1])
+        if not rows:
+            return self._forward(self.object_list, has_previous=False)
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(rows, self, has_next=True,
+                          has_previous=has_previous)
+
+    def get_page(self, cursor=None):
+        """Как page(), но битый токен возвращает первую страницу."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+    def _forward(self, posts, has_previous):
+        rows = list(posts.order_by(*self.ordering)[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return CursorPage(rows[:self.per_page], self, has_next=has_next,
+                          has_previous=has_previous)
+
+
+COUNT_GENERATION_KEY = 'paginator:count-generation'
+
+
+def invalidate_counts():
+    """Сбросить все закэшированные COUNT(*) — вызывается при записи постов."""
+    try:
+        cache.incr(COUNT_GENERATION_KEY)
+    except ValueError:
+        cache.set(COUNT_GENERATION_KEY, 1, None)
+
+
+def query_key(queryset):
+    """Поколение записей и хэш SQL запроса для ключей кэша."""
+    generation = cache.get_or_set(COUNT_GENERATION_KEY, 1, None)
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+    return f'{generation}:{digest}'
+
+
+def cached_count(queryset, timeout=None):
+    """COUNT(*) запроса из кэша; ключ включает SQL и поколение записей."""
+    if timeout is None:
+        timeout = settings.PAGINATOR_COUNT_TIMEOUT
+    key = f'paginator:count:{query_key(queryset)}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class HasMorePage(Page):
+    """Страница без общего числа объектов: только «есть ли дальше»."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+    def next_page_number(self):
+        if not self.has_more:
+            raise EmptyPage('That page contains no results')
+        return self.number + 1
+
+    def start_index(self):
+        if not len(self):
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self) - 1 if len(self) else 0
+
+
+class CountingPaginator(Paginator):
+    """Paginator с выбираемым способом подсчёта объектов.
+
+    exact        — обычный COUNT(*);
+    cached       — COUNT(*) из кэша с TTL, сбрасывается при записи постов;
+    denormalized — готовое значение known_count (счётчики групп и авторов),
+                   без него — как exact;
+    has_more     — без подсчёта: читается per_page + 1 строк.
+    """
+
+    STRATEGIES = ('exact', 'cached', 'denormalized', 'has_more')
+
+    def __init__(self, object_list, per_page, strategy='exact',
+                 known_count=None, **kwargs):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f'Unknown count strategy: {strategy}')
+        super().__init__(object_list, per_page, **kwargs)
+        self.strategy = strategy
+        self.known_count = known_count
+
+    @property
+    def skips_count(self):
+        return self.strategy == 'has_more'
+
+    @cached_property
+    def count(self):
+        if self.strategy == 'cached':
+            return cached_count(self.object_list)
+        if self.strategy == 'denormalized' and self.known_count is not None:
+            return self.known_count
+        return self.object_list.count()
+
+    def validate_number(self, number):
+        if not self.skips_count:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return 1
+        return max(number, 1)
+
+    def get_page(self, number):
+        if not self.skips_count:
+            return super().get_page(number)
+        try:
+            return self.page(number)
+        except EmptyPage:
+            return self.page(1)
+
+    def page(self, number):
+        if not self.skips_count:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return HasMorePage(rows[:self.per_page], number, self,
+                           has_more=len(rows) > self.per_page)
+
+
+class AtLeast(int):
+    """Оценка снизу: в шаблонах выводится как «N+»."""
+
+    def __str__(self):
+        return f'{int(self)}+'
+
+
+class AdminPaginator(Paginator):
+    """Paginator списка постов в админке, не зависящий от размера таблицы.
+
+    count без фильтров берётся из total() (денормализованные счётчики),
+    с фильтрами — COUNT(*) не дальше count_limit строк. Если строк
+    больше, count — AtLeast(count_limit), а страницы за оценкой
+    открываются, пока не окажутся пустыми. При порядке (-pub_date, -pk)
+    страница читается по ключу последней строки предыдущей страницы,
+    если он есть в кэше, иначе id страницы выбираются со смещением по
+    индексу, а строки — по этим id.
+    """
+
+    ordering = ['-pub_date', '-pk']
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, total=None, count_limit=None):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        self.total = total
+        self.count_limit = count_limit or settings.ADMIN_COUNT_LIMIT
+        # Номер последней прочитанной страницы и была ли она полной.
+        self.last_page = None
+
+    @cached_property
+    def count(self):
+        if self.total is not None and not self.object_list.query.where:
+            return self.total()
+        count = self.object_list.order_by()[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            return AtLeast(self.count_limit)
+        return count
+
+    @property
+    def capped(self):
+        return isinstance(self.count, AtLeast)
+
+    @property
+    def num_pages(self):
+        pages = max(math.ceil(self.count / self.per_page), 1)
+        if not self.capped:
+            return pages
+        # За оценкой есть ещё строки: видна хотя бы следующая страница.
+        pages += 1
+        if self.last_page is not None:
+            number, full = self.last_page
+            pages = max(pages, number + 1 if full else number)
+        return pages
+
+    def validate_number(self, number):
+        if not self.capped:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        keyset = list(self.object_list.query.order_by) == self.ordering
+        if keyset:
+            rows = self.keyset_rows(number)
+        else:
+            bottom = (number - 1) * self.per_page
+            rows = self.object_list[bottom:bottom + self.per_page]
+        # Страница остаётся QuerySet: по нему админка строит формы
+        # list_editable, а вычисленный результат переиспользуется.
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        if rows and keyset:
+            cache.set(self.boundary_key(number), row_key(rows[len(rows) - 1]),
+                      settings.PAGINATOR_COUNT_TIMEOUT)
+        self.last_page = (number, len(rows) == self.per_page)
+        return self._get_page(rows, number, self)
+
+    def keyset_rows(self, number):
+        boundary = None
+        if number > 1:
+            boundary = cache.get(self.boundary_key(number - 1))
+            if boundary is None:
+                return self.offset_rows(number)
+        posts = self.object_list
+        if boundary is not None:
+            pub_date, pk = boundary
+            posts = posts.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk))
+        return posts[:self.per_page]
+
+    def offset_rows(self, number):
+        bottom = (number - 1) * self.per_page
+        ids = list(self.object_list.values_list('pk', flat=True)
+                   [bottom:bottom + self.per_page])
+        return self.object_list.filter(pk__in=ids)
+
+    def boundary_key(self, number):
+        return (f'paginator:admin:{query_key(self.object_list)}:'
+                f'{self.per_page}:{number}')
@@ -0,0 +1,127 @@
+import cProfile
+import glob
+import io
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+# tracemalloc один на процесс: одновременно память снимает один запрос.
+_memory_lock = threading.Lock()
+
+
+def profile_mode(request):
+    """Что снимать с запроса: None, 'cpu' или 'memory'.
+
+    Явно профилирование включают только сотрудники — параметром
+    PROFILING_PARAM или заголовком PROFILING_HEADER со значением
+    '1' или 'memory'. Кроме того, доля PROFILING_SAMPLE_RATE всех
+    запросов профилируется без памяти.
+    """
+    value = (request.GET.get(settings.PROFILING_PARAM)
+             or request.META.get(settings.PROFILING_HEADER))
+    if value and request.user.is_staff:
+        return 'memory' if value == 'memory' else 'cpu'
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return 'cpu'
+    return None
+
+
+def view_directory(view_name):
+    """Каталог профилей представления: posts:index -> posts.index."""
+    return os.path.join(settings.PROFILING_DIR,
+                        (view_name or 'unresolved').replace(':', '.'))
+
+
+class Profile:
+    """Профиль одного запроса: cProfile и, по желанию, tracemalloc."""
+
+    def __init__(self, memory=False):
+        self.profiler = cProfile.Profile()
+        self.memory = memory
+        self.snapshot = None
+        self.duration = None
+
+    @contextmanager
+    def run(self):
+        tracing = self.memory and _memory_lock.acquire(blocking=False)
+        if tracing:
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+        start = time.perf_counter()
+        self.profiler.enable()
+        try:
+            yield self
+        finally:
+            self.profiler.disable()
+            self.duration = time.perf_counter() - start
+            if tracing:
+                self.snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                _memory_lock.release()
+
+    def summary(self, request, response, view_name):
+        out = io.StringIO()
+        out.write(f'{request.method} {request.get_full_path()} '
+                  f'-> {response.status_code}\n'
+                  f'view: {view_name}\n'
+                  f'time: {self.duration * 1000:.1f} ms\n\n')
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(
+            settings.PROFILING_SUMMARY_LINES)
+        if self.memory and self.snapshot is None:
+            out.write('Память не снята: её уже снимает другой запрос.\n')
+        if self.snapshot is not None:
+            out.write('Память по строкам:\n')
+            top = self.snapshot.statistics('lineno')
+            for stat in top[:settings.PROFILING_SUMMARY_LINES]:
+                out.write(f'{stat}\n')
+        return out.getvalue()
+
+    def save(self, request, response, view_name):
+        """Записать .prof и .txt; вернуть путь без расширения."""
+        directory = view_directory(view_name)
+        os.makedirs(directory, exist_ok=True)
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S.%f')
+        base = os.path.join(directory, f'{stamp}-{os.getpid()}')
+        self.profiler.dump_stats(base + '.prof')
+        with open(base + '.txt', 'w', encoding='utf-8') as summary:
+            summary.write(self.summary(request, response, view_name))
+        return base
+
+
+def saved_profiles(view_name):
+    return sorted(glob.glob(os.path.join(view_directory(view_name),
+                                         '*.prof')))
+
+
+def saved_views():
+    """Представления с сохранёнными профилями и число профилей."""
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return {}
+    return {
+        name.replace('.', ':'): len(glob.glob(
+            os.path.join(settings.PROFILING_DIR, name, '*.prof')))
+        for name in sorted(os.listdir(settings.PROFILING_DIR))
+    }
+
+
+def hottest(view_name, limit=20, sort='tottime', last=None, stream=None):
+    """Сводка самых дорогих функций по сохранённым профилям представления.
+
+    Возвращает число учтённых профилей, а таблицу pstats пишет в stream.
+    """
+    paths = saved_profiles(view_name)
+    if last:
+        paths = paths[-last:]
+    if not paths:
+        return 0
+    stats = pstats.Stats(*paths, stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return len(paths)
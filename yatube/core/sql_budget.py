@@ -0,0 +1,84 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Управление транзакциями повторяется законно и N+1 не считается.
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT',
+                          'RELEASE')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryReport:
+    """Запросы к БД за время обработки одного HTTP-запроса."""
+
+    def __init__(self):
+        self.url_name = None
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time_ms(self):
+        return sum(duration for _, duration in self.queries) * 1000
+
+    def repeated(self, limit):
+        """Запросы одной формы, выполненные больше limit раз (N+1).
+
+        Параметры передаются отдельно от SQL, поэтому запросы,
+        различающиеся только значениями, имеют одинаковый текст.
+        """
+        shapes = Counter(sql for sql, _ in self.queries
+                         if not sql.lstrip().upper().startswith(
+                             TRANSACTION_STATEMENTS))
+        return {sql: n for sql, n in shapes.items() if n > limit}
+
+    def problems(self, budget):
+        """Нарушения бюджета словами; пустой список — бюджет соблюдён."""
+        problems = []
+        if 'queries' in budget and self.count > budget['queries']:
+            problems.append(
+                f'{self.url_name}: {self.count} запросов '
+                f'при бюджете {budget["queries"]}')
+        if 'time_ms' in budget and self.time_ms > budget['time_ms']:
+            problems.append(
+                f'{self.url_name}: {self.time_ms:.1f} мс в БД '
+                f'при бюджете {budget["time_ms"]} мс')
+        for sql, n in self.repeated(budget.get('repeats', 1)).items():
+            problems.append(f'{self.url_name}: N+1, {n} раз: {sql}')
+        return problems
+
+
+def budget_for(url_name):
+    """Бюджет представления: SQL_BUDGET_DEFAULTS плюс SQL_BUDGETS."""
+    return {
+        **settings.SQL_BUDGET_DEFAULTS,
+        **settings.SQL_BUDGETS.get(url_name, {}),
+    }
+
+
+@contextmanager
+def record_queries():
+    """Записать запросы ко всем базам внутри блока в QueryReport."""
+    report = QueryReport()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(report))
+        yield report
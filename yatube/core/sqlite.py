@@ -0,0 +1,55 @@
+import logging
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    """Настроить каждое новое соединение SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'table is locked' in message
+
+
+def retry_on_lock(view):
+    """Выполнить функцию в транзакции, повторяя её при блокировке SQLite.
+
+    busy_timeout ждёт освобождения базы внутри одного запроса, но
+    транзакция, которая уже читала, получает «database is locked» сразу.
+    Тогда вся транзакция повторяется с экспоненциальной паузой, до
+    SQLITE_WRITE_RETRIES попыток. Внутри чужой транзакции повторять
+    нельзя, и функция просто выполняется.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return view(*args, **kwargs)
+        attempts = max(settings.SQLITE_WRITE_RETRIES, 1)
+        for attempt in range(1, attempts + 1):
+            try:
+                with transaction.atomic():
+                    return view(*args, **kwargs)
+            except OperationalError as error:
+                if attempt == attempts or not is_lock_error(error):
+                    raise
+                delay = settings.SQLITE_RETRY_BACKOFF * 2 ** (attempt - 1)
+                logger.info('%s: база заблокирована, попытка %s через '
+                            '%.3f с', view.__name__, attempt + 1, delay)
+                time.sleep(random.uniform(delay / 2, delay))
+    return wrapper
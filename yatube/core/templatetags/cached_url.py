@@ -0,0 +1,46 @@
+from django import template
+from django.template import defaulttags
+from django.urls import NoReverseMatch
+from django.utils.html import conditional_escape
+
+from core.url_cache import cached_reverse
+
+register = template.Library()
+
+
+class CachedURLNode(defaulttags.URLNode):
+    def render(self, context):
+        args = [arg.resolve(context) for arg in self.args]
+        kwargs = {k: v.resolve(context) for k, v in self.kwargs.items()}
+        view_name = self.view_name.resolve(context)
+        try:
+            current_app = context.request.current_app
+        except AttributeError:
+            try:
+                current_app = context.request.resolver_match.namespace
+            except AttributeError:
+                current_app = None
+        url = ''
+        try:
+            url = cached_reverse(view_name, args=args, kwargs=kwargs,
+                                 current_app=current_app)
+        except NoReverseMatch:
+            if self.asvar is None:
+                raise
+        if self.asvar:
+            context[self.asvar] = url
+            return ''
+        if context.autoescape:
+            url = conditional_escape(url)
+        return url
+
+
+@register.tag
+def url(parser, token):
+    """{% url %} с запомненными маршрутами, синтаксис тот же.
+
+    Подключён в TEMPLATES как builtins и заменяет стандартный тег во
+    всех шаблонах.
+    """
+    node = defaulttags.url(parser, token)
+    return CachedURLNode(node.view_name, node.args, node.kwargs, node.asvar)
@@ -0,0 +1,22 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.page_holes import HOLE
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name):
+    """Включить шаблон или, при кэшировании страницы, оставить метку.
+
+    Работает как {% include %} с текущим контекстом. Внутри
+    punch_holes() выводит метку, которую fill_holes() потом заменит
+    шаблоном, отрисованным для конкретного пользователя.
+    """
+    holes = getattr(context.get('request'), 'page_holes', None)
+    if holes is None:
+        included = context.template.engine.get_template(template_name)
+        return included.render(context)
+    holes.append(template_name)
+    return mark_safe(HOLE.format(template_name))
@@ -0,0 +1,48 @@
+from django import template
+from django.conf import settings
+from django.http import QueryDict
+
+register = template.Library()
+
+
+@register.filter
+def elided_page_range(page_obj, on_each_side=None):
+    """Номера страниц вокруг текущей, первая и последняя.
+
+    Пропуски обозначаются None, поэтому число ссылок не зависит
+    от общего количества страниц.
+    """
+    if on_each_side is None:
+        on_each_side = settings.PAGINATOR_ON_EACH_SIDE
+    on_each_side = int(on_each_side)
+    number = page_obj.number
+    if getattr(page_obj.paginator, 'skips_count', False):
+        num_pages = number + 1 if page_obj.has_next() else number
+    else:
+        num_pages = page_obj.paginator.num_pages
+    start = max(number - on_each_side, 1)
+    end = min(number + on_each_side, num_pages)
+    if start > 1:
+        yield 1
+        if start > 2:
+            yield None
+    yield from range(start, end + 1)
+    if end < num_pages:
+        if end < num_pages - 1:
+            yield None
+        yield num_pages
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context, **kwargs):
+    """Строка запроса текущей страницы с новым page или cursor.
+
+    Остальные параметры (например, поисковый запрос) сохраняются.
+    """
+    request = context.get('request')
+    query = request.GET.copy() if request else QueryDict(mutable=True)
+    for key in ('page', 'cursor'):
+        query.pop(key, None)
+    for key, value in kwargs.items():
+        query[key] = value
+    return query.urlencode()
@@ -0,0 +1,16 @@
+from .sql_budget import budget_for
+
+
+class QueryBudgetTestMixin:
+    """Проверки бюджета запросов для TestCase.
+
+    Требует QueryBudgetMiddleware: отчёт берётся из ответа тестового
+    клиента.
+    """
+
+    def assertQueryBudget(self, response, **budget):
+        report = response.query_report
+        budget = {**budget_for(report.url_name), **budget}
+        problems = report.problems(budget)
+        if problems:
+            self.fail('\n'.join(problems))
@@ -0,0 +1,178 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from django.core.signals import request_finished
+from django.template.base import Template
+
+from .sql_budget import record_queries
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def current_timer():
+    return getattr(_state, 'timer', None)
+
+
+def mark(name):
+    """Отметить момент name в таймере текущего запроса, если он есть."""
+    timer = current_timer()
+    if timer is not None:
+        timer.mark(name)
+
+
+class RequestTimer:
+    """Время фаз одного HTTP-запроса.
+
+    Фазы считаются по отметкам, которые ставят ServerTimingMiddleware
+    (снаружи всех middleware) и ViewTimingMiddleware (внутри всех):
+    start, handler, resolved, view, view_done, response и finished.
+    Время в БД и шаблонах входит в фазу view, но показывается отдельно.
+    """
+
+    def __init__(self):
+        self.marks = {'start': time.perf_counter()}
+        # Имя шаблона -> [число рендеров, собственное время].
+        self.templates = defaultdict(lambda: [0, 0.0])
+        # Время вложенных шаблонов, накопленное для каждого уровня.
+        self.nesting = []
+        self.queries = None
+        self.request_line = {}
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter()
+
+    def between(self, start, end):
+        if start not in self.marks or end not in self.marks:
+            return 0.0
+        return self.marks[end] - self.marks[start]
+
+    @contextmanager
+    def template(self, name):
+        """Учесть рендер шаблона без времени вложенных в него шаблонов."""
+        self.nesting.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            children = self.nesting.pop()
+            if self.nesting:
+                self.nesting[-1] += duration
+            stat = self.templates[name]
+            stat[0] += 1
+            stat[1] += duration - children
+
+    def phases(self):
+        """Длительности фаз в миллисекундах."""
+        handler = self.between('handler', 'view_done')
+        if 'resolved' in self.marks:
+            resolve = self.between('handler', 'resolved')
+        else:
+            # Адрес не нашёлся: всё время обработчика ушло на 404.
+            resolve = handler
+        phases = {
+            'total': self.between('start', 'response'),
+            'middleware': (self.between('start', 'response') - handler
+                           + self.between('resolved', 'view')),
+            'resolve': resolve,
+            'view': self.between('view', 'view_done'),
+            'db': self.queries.time_ms / 1000,
+            'templates': sum(seconds for _, seconds
+                             in self.templates.values()),
+        }
+        if 'finished' in self.marks:
+            # Отправка тела ответа сервером, для потоковых — и его
+            # генерация.
+            phases['serialize'] = self.between('response', 'finished')
+        return {name: round(seconds * 1000, 3)
+                for name, seconds in phases.items()}
+
+    def header(self):
+        """Значение заголовка Server-Timing."""
+        entries = []
+        for name, ms in self.phases().items():
+            entry = f'{name};dur={ms}'
+            if name == 'db':
+                entry += f';desc="{self.queries.count} queries"'
+            entries.append(entry)
+        for name, (count, seconds) in self.templates.items():
+            entries.append(f'tpl;dur={round(seconds * 1000, 3)};'
+                           f'desc="{name} x{count}"')
+        return ', '.join(entries)
+
+    def log_record(self):
+        return {
+            **self.request_line,
+            'phases_ms': self.phases(),
+            'db_queries': self.queries.count,
+            'templates_ms': {
+                name: {'count': count, 'ms': round(seconds * 1000, 3)}
+                for name, (count, seconds) in self.templates.items()
+            },
+        }
+
+
+@contextmanager
+def time_request():
+    """Таймер запроса для шаблонов и запросов к БД внутри блока."""
+    timer = RequestTimer()
+    _state.timer = timer
+    try:
+        with record_queries() as report:
+            timer.queries = report
+            yield timer
+    finally:
+        _state.timer = None
+        timer.mark('response')
+
+
+def finish_request(timer, request, response):
+    """Дождаться закрытия ответа, чтобы записать строку в лог."""
+    match = request.resolver_match
+    timer.request_line = {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+    }
+    _state.finished = timer
+
+
+def log_finished(sender, **kwargs):
+    timer = getattr(_state, 'finished', None)
+    if timer is None:
+        return
+    _state.finished = None
+    timer.mark('finished')
+    logger.info(json.dumps(timer.log_record(), ensure_ascii=False))
+
+
+def timed_render(render):
+    @wraps(render)
+    def wrapper(self, context):
+        timer = current_timer()
+        if timer is None:
+            return render(self, context)
+        with timer.template(self.name or '<template>'):
+            return render(self, context)
+    wrapper.timed = True
+    return wrapper
+
+
+def instrument():
+    """Подключить замеры рендера шаблонов и запись строк лога.
+
+    Django шлёт сигнал о рендере шаблона только в тестах, поэтому
+    Template.render оборачивается так же, как это делает тестовое
+    окружение. Вызывается из middleware, только если замеры включены.
+    """
+    if not getattr(Template.render, 'timed', False):
+        Template.render = timed_render(Template.render)
+    request_finished.connect(log_finished, dispatch_uid='core.timing')
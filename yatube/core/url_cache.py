@@ -0,0 +1,135 @@
+import re
+from urllib.parse import quote
+from weakref import WeakKeyDictionary
+
+from django.urls import get_resolver, get_script_prefix, get_urlconf, reverse
+from django.urls.resolvers import get_ns_resolver
+from django.utils.encoding import iri_to_uri
+from django.utils.http import RFC3986_SUBDELIMS, escape_leading_slashes
+
+# Маршруты хранятся при корневом резолвере URLconf. Django создаёт новый
+# резолвер при смене ROOT_URLCONF и в clear_url_caches(), и тогда старые
+# маршруты уходят вместе с ним.
+_routes = WeakKeyDictionary()
+
+
+class Route:
+    """Вариант шаблона URL с уже подставленным префиксом пространств имён.
+
+    Повторяет проверку из URLResolver._reverse_with_prefix: аргументы
+    проходят через конвертеры, итоговый путь сверяется с регулярным
+    выражением маршрута. URL без аргументов вычисляется один раз.
+    """
+
+    def __init__(self, prefix, result, params, pattern, defaults,
+                 converters):
+        self.template = prefix.replace('%', '%%') + result
+        self.params = params
+        self.defaults = defaults
+        self.converters = converters
+        self.regex = re.compile(f'^{re.escape(prefix)}{pattern}')
+        self.static = None
+        if not params and not defaults:
+            self.static = self.substitute({})
+
+    def fill(self, args, kwargs):
+        """URL для аргументов или None, если маршрут им не подходит."""
+        if self.static is not None and not args and not kwargs:
+            return self.static
+        if args:
+            if len(args) != len(self.params):
+                return None
+            subs = dict(zip(self.params, args))
+        else:
+            if set(kwargs).symmetric_difference(self.params).difference(
+                    self.defaults):
+                return None
+            if any(kwargs.get(key, value) != value
+                   for key, value in self.defaults.items()):
+                return None
+            subs = kwargs
+        return self.substitute(subs)
+
+    def substitute(self, subs):
+        text = {}
+        for key, value in subs.items():
+            converter = self.converters.get(key)
+            text[key] = converter.to_url(value) if converter else str(value)
+        path = self.template % text
+        if not self.regex.search(path):
+            return None
+        url = quote(path, safe=RFC3986_SUBDELIMS + '/~:@')
+        return iri_to_uri(escape_leading_slashes(url))
+
+
+def namespace_resolver(resolver, viewname, current_app):
+    """Резолвер и имя маршрута после разбора 'ns:...:name', как в reverse().
+
+    None, если пространства имён нет: ошибку тогда сформулирует reverse().
+    """
+    *path, view = viewname.split(':')
+    current_path = current_app.split(':') if current_app else []
+    ns_pattern = ''
+    ns_converters = {}
+    for ns in path:
+        current_ns = current_path.pop(0) if current_path else None
+        app_list = resolver.app_dict.get(ns)
+        if app_list:
+            if current_ns and current_ns in app_list:
+                ns = current_ns
+            elif ns not in app_list:
+                ns = app_list[0]
+        if ns != current_ns:
+            current_path = []
+        if ns not in resolver.namespace_dict:
+            return None, view
+        extra, resolver = resolver.namespace_dict[ns]
+        ns_pattern += extra
+        ns_converters.update(resolver.pattern.converters)
+    if ns_pattern:
+        resolver = get_ns_resolver(ns_pattern, resolver,
+                                   tuple(ns_converters.items()))
+    return resolver, view
+
+
+def routes_for(root, viewname, prefix, current_app):
+    resolver, view = namespace_resolver(root, viewname, current_app)
+    if resolver is None:
+        return None
+    return [
+        Route(prefix, result, params, pattern, defaults, converters)
+        for possibility, pattern, defaults, converters
+        in resolver.reverse_dict.getlist(view)
+        for result, params in possibility
+    ]
+
+
+def cached_reverse(viewname, urlconf=None, args=None, kwargs=None,
+                   current_app=None):
+    """reverse() с запомненными маршрутами: подставляются только аргументы.
+
+    Разбор пространств имён и поиск шаблонов выполняются один раз на
+    имя маршрута. Если ни один запомненный вариант не подошёл, вызывается
+    обычный reverse(): он даст то же NoReverseMatch.
+    """
+    if not isinstance(viewname, str):
+        return reverse(viewname, urlconf, args, kwargs, current_app)
+    if args and kwargs:
+        raise ValueError("Don't mix *args and **kwargs in call to reverse()!")
+    root = get_resolver(urlconf if urlconf is not None else get_urlconf())
+    prefix = get_script_prefix()
+    cache = _routes.get(root)
+    if cache is None:
+        cache = _routes.setdefault(root, {})
+    key = (viewname, prefix, current_app)
+    routes = cache.get(key)
+    if routes is None:
+        routes = routes_for(root, viewname, prefix, current_app)
+        if routes is None:
+            return reverse(viewname, urlconf, args, kwargs, current_app)
+        cache[key] = routes
+    for route in routes:
+        url = route.fill(args or (), kwargs or {})
+        if url is not None:
+            return url
+    return reverse(viewname, urlconf, args, kwargs, current_app)
@@ -1,8 +1,40 @@
-from django.core.paginator import Paginator
+from django.conf import settings
 
+from .paginator import CountingPaginator, CursorPaginator
 
-def get_paginator_obj(request, posts, COUNT_POSTS):
-    paginator = Paginator(posts, COUNT_POSTS)
+CURSOR_PARAM = 'cursor'
+
+
+def count_strategy(request):
+    """Способ подсчёта постов для текущего представления."""
+    match = getattr(request, 'resolver_match', None)
+    view_name = match.view_name if match else None
+    return settings.PAGINATOR_COUNT_STRATEGIES.get(view_name, 'exact')
+
+
+def get_paginator_obj(request, posts, COUNT_POSTS, mode=None,
+                      known_count=None):
+    """Страница ленты: по номеру (?page=N) или по курсору (?cursor=...).
+
+    Курсорный режим включается параметром ``cursor`` в запросе
+    (пустое значение — первая страница) либо через ``mode='cursor'``
+    или настройку PAGINATION_MODE. Явный ``mode='page'`` курсор
+    не принимает.
+
+    Для нумерованных страниц способ подсчёта берётся из
+    PAGINATOR_COUNT_STRATEGIES по имени URL с пространством имён;
+    ``known_count`` — денормализованное число постов для стратегии
+    'denormalized'.
+    """
+    if mode is None:
+        mode = ('cursor' if CURSOR_PARAM in request.GET
+                else getattr(settings, 'PAGINATION_MODE', 'page'))
+    if mode == 'cursor':
+        paginator = CursorPaginator(posts, COUNT_POSTS)
+        return paginator.get_page(request.GET.get(CURSOR_PARAM))
+    paginator = CountingPaginator(posts, COUNT_POSTS,
+                                  strategy=count_strategy(request),
+                                  known_count=known_count)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
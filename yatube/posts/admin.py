@@ -1,6 +1,104 @@
+import datetime
+
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.paginator import AdminPaginator
+from .models import AuthorCounter, Post, Group
+from .search import filter_posts
+
+
+def truncate_date(day, kind):
+    if kind == 'year':
+        return day.replace(month=1, day=1)
+    if kind == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(day, kind):
+    if kind == 'year':
+        return day.replace(year=day.year + 1)
+    if kind == 'month':
+        if day.month == 12:
+            return day.replace(year=day.year + 1, month=1)
+        return day.replace(month=day.month + 1)
+    return day + datetime.timedelta(days=1)
+
+
+def indexed_dates(queryset, field_name, kind):
+    """То же, что queryset.dates(field_name, kind), но поиском по индексу.
+
+    dates() группирует всю выборку по усечённой дате. Здесь начало
+    каждого следующего периода ищется как первая запись после конца
+    предыдущего: запросов столько, сколько периодов, и каждый — один
+    шаг по индексу.
+    """
+    def first_value(start=None):
+        probe = queryset
+        if start is not None:
+            # SQLite ищет по индексу от первой нижней границы в WHERE,
+            # поэтому граница пробы ставится раньше условий списка.
+            probe = queryset.model._base_manager.filter(
+                **{f'{field_name}__gte': start}) & queryset
+        return (probe.order_by(field_name)
+                .values_list(field_name, flat=True).first())
+
+    dates = []
+    value = first_value()
+    while value is not None:
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        period = truncate_date(value.date(), kind)
+        dates.append(period)
+        start = datetime.datetime.combine(next_period(period, kind),
+                                          datetime.time.min)
+        if settings.USE_TZ:
+            start = timezone.make_aware(start)
+        value = first_value(start)
+    return dates
+
+
+def total_posts():
+    """Число постов по счётчикам авторов, без COUNT(*) по таблице."""
+    return AuthorCounter.objects.aggregate(
+        total=Sum('posts_count'))['total'] or 0
 
-from .models import Post, Group
+
+class RowAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которое берёт выбранный объект из строки списка.
+
+    Стандартный виджет ищет подпись выбранного значения отдельным
+    запросом в каждой строке list_editable, хотя группа поста уже
+    получена через list_select_related.
+    """
+
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        obj = self.selected_object
+        if obj is None or [str(v) for v in value] != [str(obj.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, obj.pk, self.choices.field.label_from_instance(obj),
+            True, len(options)))
+        return [(None, options, 0)]
+
+
+class PostChangeListForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        widget = self.fields['group'].widget
+        # В админке виджет обёрнут в RelatedFieldWidgetWrapper.
+        widget = getattr(widget, 'widget', widget)
+        widget.selected_object = self.instance.group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,11 +109,49 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group',
     )
+    list_select_related = ('author', 'group')
     list_editable = ('group',)
+    # Вместо <select> со всеми группами в каждой строке — поиск по мере
+    # ввода.
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
+    # Фильтр по дате — готовые ссылки без запросов, а date_hierarchy
+    # находит периоды по индексу (см. indexed_dates).
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    # Для больших таблиц: без второго COUNT(*) и с оценкой первого.
+    show_full_result_count = False
+    paginator = AdminPaginator
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group':
+            kwargs['widget'] = RowAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request,
+                                                **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return self.paginator(queryset, per_page, orphans,
+                              allow_empty_first_page, total=total_posts)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_posts(queryset, search_term), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'posts_count')
+    search_fields = ('title', 'slug')
+    prepopulated_fields = {'slug': ('title',)}
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+
+from core.paginator import invalidate_counts
+
+from .counters import rebuild_counters
+from .feeds import index_feed, touch_feeds
+from .models import Post
+
+
+@contextmanager
+def keep_pub_date():
+    """Разрешить bulk_create сохранить заданный pub_date.
+
+    auto_now_add перезаписывает дату при вставке, а при загрузке
+    готовых данных она должна остаться исходной.
+    """
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def finish_bulk_load(feed_keys=()):
+    """Привести производные данные в порядок после bulk_create.
+
+    bulk_create не шлёт сигналы, поэтому счётчики пересчитываются
+    целиком, закэшированные COUNT(*) сбрасываются, а общая лента и
+    feed_keys отмечаются изменёнными. Поисковый индекс обновляют
+    триггеры SQLite.
+    """
+    rebuild_counters()
+    invalidate_counts()
+    touch_feeds({index_feed(), *feed_keys})
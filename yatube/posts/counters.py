@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import AuthorCounter, Group, Post
+
+User = get_user_model()
+
+
+def shifted_count(delta):
+    """posts_count + delta, но не меньше нуля.
+
+    Пути с bulk_create обходят сигналы, и счётчик может отставать. Без
+    ограничения вычитание ушло бы ниже нуля, нарушило CHECK положительного
+    поля и сорвало удаление поста. Расхождение потом сводит recount_posts.
+    """
+    return Greatest(F('posts_count') + delta, 0)
+
+
+def change_author_count(author_id, delta):
+    if author_id is None:
+        return
+    if delta > 0:
+        AuthorCounter.objects.get_or_create(author_id=author_id)
+    AuthorCounter.objects.filter(author_id=author_id).update(
+        posts_count=shifted_count(delta))
+
+
+def change_group_count(group_id, delta):
+    if group_id is None:
+        return
+    Group.objects.filter(pk=group_id).update(
+        posts_count=shifted_count(delta))
+
+
+def load_counted(post):
+    """Перед сохранением дочитать из БД, под кем учтён пост.
+
+    Пост, загруженный с only()/defer(), через raw() или собранный
+    вручную с pk, не знает прежних автора и группы. Без них обновление
+    посчиталось бы как новый пост.
+    """
+    counted = getattr(post, '_counted', {})
+    missing = [field for field in ('author_id', 'group_id')
+               if field not in counted]
+    if post.pk is None or not missing:
+        return
+    previous = Post.objects.filter(pk=post.pk).values(*missing).first()
+    if previous is not None:
+        post._counted = {**counted, **previous}
+
+
+def post_saved(post, created):
+    """Перенести пост в счётчиках на текущих автора и группу.
+
+    Обновления идут через F()-выражения, поэтому одновременные записи
+    не теряют друг друга.
+    """
+    counted = {} if created else getattr(post, '_counted', {})
+    if created or counted.get('author_id') != post.author_id:
+        change_author_count(counted.get('author_id'), -1)
+        change_author_count(post.author_id, 1)
+    if created or counted.get('group_id') != post.group_id:
+        change_group_count(counted.get('group_id'), -1)
+        change_group_count(post.group_id, 1)
+    post.remember_counted_fields()
+
+
+def post_deleted(post):
+    change_author_count(post.author_id, -1)
+    change_group_count(post.group_id, -1)
+
+
+def expected_counts():
+    """Фактическое число постов: ({author_id: n}, {group_id: n})."""
+    authors = dict(
+        Post.objects.order_by().values_list('author')
+        .annotate(total=Count('id'))
+    )
+    groups = dict(
+        Group.objects.order_by().annotate(total=Count('posts'))
+        .values_list('id', 'total')
+    )
+    return authors, groups
+
+
+def find_mismatches():
+    """Список (объект, в счётчике, на самом деле) с расхождениями."""
+    authors, groups = expected_counts()
+    stored = dict(AuthorCounter.objects.values_list('author', 'posts_count'))
+    mismatches = []
+    for user in User.objects.filter(pk__in=set(authors) | set(stored)):
+        actual = authors.get(user.pk, 0)
+        if stored.get(user.pk, 0) != actual:
+            mismatches.append((user, stored.get(user.pk, 0), actual))
+    for group in Group.objects.all():
+        actual = groups.get(group.pk, 0)
+        if group.posts_count != actual:
+            mismatches.append((group, group.posts_count, actual))
+    return mismatches
+
+
+@transaction.atomic
+def rebuild_counters():
+    """Пересчитать все счётчики по таблице постов. Вернуть число правок."""
+    fixed = 0
+    for obj, _, actual in find_mismatches():
+        if isinstance(obj, Group):
+            Group.objects.filter(pk=obj.pk).update(posts_count=actual)
+        else:
+            AuthorCounter.objects.update_or_create(
+                author=obj, defaults={'posts_count': actual})
+        fixed += 1
+    return fixed
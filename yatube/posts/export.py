@@ -0,0 +1,60 @@
+import csv
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+FIELDS = ('id', 'pub_date', 'author', 'group', 'text')
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer: возвращает строку как есть."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=None):
+    """Посты словарями в порядке публикации, читаемые порциями.
+
+    select_related подтягивает автора и группу тем же запросом, а
+    iterator() не складывает весь queryset в кэш, поэтому память
+    не зависит от числа постов.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    posts = (queryset.select_related('author', 'group')
+             .order_by('pub_date', 'id').iterator(chunk_size=chunk_size))
+    for post in posts:
+        yield {
+            'id': post.id,
+            'pub_date': post.pub_date.isoformat(),
+            'author': post.author.username,
+            'group': post.group.slug if post.group else None,
+            'text': post.text,
+        }
+
+
+def render_rows(rows, fmt):
+    """Строки выгрузки в выбранном формате, по одной на пост."""
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(FIELDS)
+        for row in rows:
+            yield writer.writerow([row[field] for field in FIELDS])
+    else:
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def export_response(queryset, fmt, filename):
+    if fmt not in FORMATS:
+        fmt = 'csv'
+    response = StreamingHttpResponse(
+        render_rows(export_rows(queryset), fmt), content_type=FORMATS[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{fmt}"')
+    return response
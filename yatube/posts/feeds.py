@@ -0,0 +1,197 @@
+import datetime
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from core.page_holes import fill_holes, punch_holes
+
+from .models import FeedMarker, Group, Post
+
+User = get_user_model()
+
+MARKER_PREFIX = 'feed-marker:'
+
+# Время лент, в которые ещё не было записей. Отметки создаются только
+# записью: чтение несуществующей группы или профиля ничего не пишет.
+NEVER_CHANGED = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def all_feeds():
+    """Отметка, от которой зависят все ленты, например смена оформления."""
+    return 'all'
+
+
+def index_feed():
+    return 'index'
+
+
+def group_feed(slug):
+    return f'group:{slug}'
+
+
+def profile_feed(username):
+    return f'profile:{username}'
+
+
+def post_feed(post_id):
+    return f'post:{post_id}'
+
+
+def touch_feeds(keys):
+    """Отметить ленты изменёнными сейчас.
+
+    Отметки хранятся в таблице FeedMarker, чтобы все процессы видели одно
+    и то же время. Кэш перед таблицей может быть своим у каждого
+    процесса, поэтому отметка живёт в нём FEED_MARKER_TIMEOUT секунд:
+    запись из другого процесса (воркера, команды) становится видна
+    не позже этого срока.
+    """
+    now = timezone.now()
+    FeedMarker.objects.filter(key__in=keys).update(changed_at=now)
+    FeedMarker.objects.bulk_create(
+        [FeedMarker(key=key, changed_at=now) for key in keys],
+        ignore_conflicts=True)
+    cache.set_many({MARKER_PREFIX + key: now for key in keys},
+                   settings.FEED_MARKER_TIMEOUT)
+    return now
+
+
+def feed_markers(keys):
+    """Время последнего изменения каждой ленты: {key: datetime}."""
+    cached = cache.get_many([MARKER_PREFIX + key for key in keys])
+    markers = {key: cached[MARKER_PREFIX + key]
+               for key in keys if MARKER_PREFIX + key in cached}
+    missing = [key for key in keys if key not in markers]
+    if missing:
+        markers.update(FeedMarker.objects.filter(key__in=missing)
+                       .values_list('key', 'changed_at'))
+        markers.update((key, NEVER_CHANGED) for key in missing
+                       if key not in markers)
+        cache.set_many({MARKER_PREFIX + key: markers[key]
+                        for key in missing}, settings.FEED_MARKER_TIMEOUT)
+    return markers
+
+
+def post_feeds(post, old_author_id=None, old_group_id=None):
+    """Ленты, в которых показан пост, с учётом прежних автора и группы."""
+    keys = {index_feed(), post_feed(post.pk)}
+    author_ids = {post.author_id, old_author_id} - {None}
+    group_ids = {post.group_id, old_group_id} - {None}
+    keys.update(profile_feed(username) for username in
+                User.objects.filter(pk__in=author_ids)
+                .values_list('username', flat=True))
+    keys.update(group_feed(slug) for slug in
+                Group.objects.filter(pk__in=group_ids)
+                .values_list('slug', flat=True))
+    return keys
+
+
+def post_detail_feeds(request, post_id):
+    # Страница поста показывает и число постов автора, поэтому зависит
+    # ещё и от ленты профиля.
+    username = (Post.objects.filter(pk=post_id)
+                .values_list('author__username', flat=True).first())
+    if username is None:
+        return []
+    return [post_feed(post_id), profile_feed(username)]
+
+
+def audience(user, keys):
+    """Чем страница ленты может отличаться для вошедшего пользователя.
+
+    Содержимое лент зависит от пользователя только так: сотрудникам и
+    владельцу профиля показываются ссылки на выгрузку и правку. Всё
+    остальное, что видно только ему, живёт в шапке.
+    """
+    owner = profile_feed(user.username) in keys
+    return f'{"staff" if user.is_staff else "user"}-{int(owner)}'
+
+
+def guest_page(request, view, version, *args, **kwargs):
+    """Страница гостя целиком из кэша."""
+    if not settings.PAGE_CACHE_ENABLED:
+        return view(request, *args, **kwargs)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    cache_key = f'feed-page:{version}:{path}'
+    response = cache.get(cache_key)
+    if response is None:
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cache_key, response, settings.PAGE_CACHE_TIMEOUT)
+    return response
+
+
+def member_page(request, view, version, keys, *args, **kwargs):
+    """Страница вошедшего пользователя: общее тело и своя шапка.
+
+    Страница рендерится с метками вместо {% hole %} и в таком виде
+    кэшируется для всех пользователей одной аудитории. На каждый
+    запрос заново рисуются только шаблоны на месте меток.
+    """
+    if not settings.PAGE_CACHE_ENABLED:
+        return view(request, *args, **kwargs)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    role = audience(request.user, keys)
+    cache_key = f'feed-body:{version}:{role}:{path}'
+    cached = cache.get(cache_key)
+    if cached is None:
+        with punch_holes(request) as holes:
+            response = view(request, *args, **kwargs)
+        cached = (response, holes)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(cache_key, cached, settings.PAGE_CACHE_TIMEOUT)
+    response, holes = cached
+    if holes:
+        response.content = fill_holes(request, response.content, holes)
+    return response
+
+
+def feed_page(get_keys):
+    """Условный GET и кэш страниц для представления ленты.
+
+    get_keys(request, **kwargs) возвращает ключи лент, от которых
+    зависит страница. По ним строятся ETag и Last-Modified: если клиент
+    прислал актуальные, отвечаем 304, не выполняя представление. Гостям
+    готовая страница отдаётся из кэша, вошедшим — кэшированное тело с
+    отрисованной для них шапкой. Ключ кэша включает время изменения
+    лент, поэтому запись поста сама делает старые копии недостижимыми.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            keys = list(get_keys(request, **kwargs))
+            if not keys:
+                return view(request, *args, **kwargs)
+            keys.append(all_feeds())
+            markers = feed_markers(keys)
+            changed_at = max(markers.values())
+            user_id = request.user.pk or 0
+            version = hashlib.md5(
+                repr(sorted(markers.items())).encode()).hexdigest()
+            etag = f'W/"{version}-{user_id}"'
+            last_modified = int(changed_at.timestamp())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                return response
+            if request.user.is_authenticated:
+                response = member_page(request, view, version, keys,
+                                       *args, **kwargs)
+            else:
+                response = guest_page(request, view, version,
+                                      *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -1,12 +1,43 @@
+from django.db import models
 from django.forms import ModelForm
 
+from core.sqlite import retry_on_lock
+
 from .models import Post
 
 
 class PostForm(ModelForm):
     class Meta:
         model = Post
-        labels = {'group': 'Группа', 'text': 'Текст поста'}
+        labels = {'group': 'Группа', 'text': 'Текст поста',
+                  'image': 'Картинка'}
         help_texts = {'group': 'Выберите группу',
-                      'text': 'Введите текст поста'}
-        fields = ['text', 'group']
+                      'text': 'Введите текст поста',
+                      'image': 'Загрузите картинку к посту'}
+        fields = ['text', 'group', 'image']
+
+    def save_retrying(self):
+        """Сохранить пост, повторяя при блокировке SQLite только запись.
+
+        Загруженная картинка кладётся в хранилище один раз, до транзакции,
+        и повтор не оставляет на диске её копий. Новый пост перед каждой
+        попыткой снова становится новым: id откатившейся вставки мог
+        достаться чужому посту.
+        """
+        post = self.instance
+        adding = post._state.adding
+        counted = getattr(post, '_counted', None)
+        for field in post._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                field.pre_save(post, adding)
+
+        @retry_on_lock
+        def write():
+            if adding:
+                post.pk = None
+                post._state.adding = True
+            if counted is not None:
+                # Откатившаяся попытка уже перенесла пост в счётчиках.
+                post._counted = dict(counted)
+            return self.save()
+        return write()
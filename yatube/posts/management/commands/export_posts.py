@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, export_rows, render_rows
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгрузить посты автора или группы в CSV или JSONL.'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--author', help='username автора.')
+        target.add_argument('--group', help='slug группы.')
+        parser.add_argument('--format', choices=tuple(FORMATS),
+                            default='jsonl')
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--output', default='-',
+                            help='Файл для выгрузки, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        if options['author']:
+            posts = Post.objects.filter(author__username=options['author'])
+            exists = User.objects.filter(username=options['author'])
+        else:
+            posts = Post.objects.filter(group__slug=options['group'])
+            exists = Group.objects.filter(slug=options['group'])
+        if not exists.exists():
+            raise CommandError('Автор или группа не найдены.')
+        lines = render_rows(export_rows(posts, options['chunk_size']),
+                            options['format'])
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as out:
+            out.writelines(lines)
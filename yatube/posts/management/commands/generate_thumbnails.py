@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Подготовить недостающие миниатюры картинок постов, '
+            'например после смены POST_THUMBNAILS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Размер пула потоков; 0 — в этом потоке.')
+
+    def handle(self, *args, **options):
+        post_ids = list(Post.objects.exclude(image='').order_by('id')
+                        .values_list('id', flat=True))
+        if options['workers']:
+            with ThreadPoolExecutor(options['workers']) as pool:
+                created = sum(pool.map(thumbnails.run, post_ids))
+        else:
+            created = sum(map(thumbnails.generate_thumbnails, post_ids))
+        self.stdout.write(self.style.SUCCESS(
+            f'Постов с картинками: {len(post_ids)}, '
+            f'миниатюры созданы для {created}'))
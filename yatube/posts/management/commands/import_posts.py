@@ -0,0 +1,210 @@
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import finish_bulk_load, keep_pub_date
+from posts.feeds import group_feed, profile_feed
+from posts.models import Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+
+class RowError(Exception):
+    pass
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            # Пустые строки — не записи: не ошибка и не номер.
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+class Command(BaseCommand):
+    help = ('Потоково загрузить посты из JSONL или CSV (файл или stdin). '
+            'Поля: text, author (username), group (slug), pub_date.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('source',
+                            help='Путь к файлу или «-» для stdin.')
+        parser.add_argument('--format', choices=('jsonl', 'csv'),
+                            help='По умолчанию — по расширению файла.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Создавать неизвестных авторов и группы.')
+        parser.add_argument('--checkpoint',
+                            help='Имя контрольной точки; по умолчанию '
+                                 'абсолютный путь к файлу. Точка хранится '
+                                 'до успешного окончания загрузки.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Начать с начала, забыв контрольную точку.')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        fmt = options['format'] or (
+            'csv' if source.lower().endswith('.csv') else 'jsonl')
+        checkpoint_name = options['checkpoint'] or (
+            'stdin' if source == '-' else os.path.abspath(source))
+        self.create_missing = options['create_missing']
+        self.authors, self.groups = {}, {}
+        self.touched = set()
+        self.unusable_password = make_password(None)
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            source=checkpoint_name[-255:])
+        if options['restart']:
+            checkpoint.position = 0
+            checkpoint.save()
+        if source == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8',
+                                      newline='')
+        else:
+            try:
+                stream = open(source, encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(error)
+        with stream:
+            reader = read_csv(stream) if fmt == 'csv' else read_jsonl(stream)
+            rows = enumerate(reader)
+            if checkpoint.position:
+                self.stdout.write(
+                    f'Продолжаем с записи {checkpoint.position}')
+                rows = itertools.islice(rows, checkpoint.position, None)
+            imported, skipped = self.load(rows, checkpoint,
+                                          options['batch_size'])
+        # Точка нужна, только чтобы продолжить после сбоя. Источник,
+        # загруженный до конца, при следующем запуске читается с начала:
+        # иначе следующий поток stdin потерял бы столько же первых строк.
+        checkpoint.delete()
+        finish_bulk_load(self.touched)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено постов: {imported}, пропущено записей: {skipped}'))
+
+    def load(self, rows, checkpoint, batch_size):
+        """Загрузить записи порциями; память не растёт с размером файла."""
+        imported = skipped = 0
+        started = time.monotonic()
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return imported, skipped
+            with transaction.atomic():
+                posts = self.build_posts(batch)
+                with keep_pub_date():
+                    Post.objects.bulk_create(posts)
+                checkpoint.position = batch[-1][0] + 1
+                checkpoint.save(update_fields=('position', 'updated_at'))
+            imported += len(posts)
+            skipped += len(batch) - len(posts)
+            rate = imported / max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                f'Записей: {checkpoint.position}, постов: {imported}, '
+                f'{rate:.0f} строк/с')
+
+    def build_posts(self, batch):
+        records = [record for _, record in batch
+                   if isinstance(record, dict)]
+        self.resolve('author', records)
+        self.resolve('group', records)
+        now = timezone.now()
+        posts = []
+        for number, record in batch:
+            try:
+                posts.append(self.build_post(record, now))
+            except RowError as error:
+                self.stderr.write(f'Запись {number}: {error}')
+        return posts
+
+    def build_post(self, record, now):
+        if not isinstance(record, dict):
+            raise RowError('не удалось разобрать')
+        text = record.get('text') or ''
+        if not isinstance(text, str):
+            raise RowError(f'text не строка: {text!r}')
+        text = text.strip()
+        if not text:
+            raise RowError('пустой text')
+        author = record.get('author')
+        author_id = self.lookup(self.authors, author, 'автор')
+        group = record.get('group') or None
+        group_id = None
+        if group is not None:
+            group_id = self.lookup(self.groups, group, 'группа')
+            self.touched.add(group_feed(group))
+        self.touched.add(profile_feed(author))
+        post = Post(text=text, author_id=author_id, group_id=group_id,
+                    pub_date=self.parse_pub_date(record, now))
+        post.render_text()
+        return post
+
+    def lookup(self, known, value, label):
+        if isinstance(value, str) and value in known:
+            return known[value]
+        raise RowError(f'не найдено: {label} {value!r}')
+
+    def parse_pub_date(self, record, now):
+        if not record.get('pub_date'):
+            return now
+        try:
+            pub_date = parse_datetime(str(record['pub_date']))
+        except (TypeError, ValueError):
+            # Похоже на дату, но такого дня или часа нет: 2021-02-30.
+            pub_date = None
+        if pub_date is None:
+            raise RowError(f'неверная дата {record["pub_date"]!r}')
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date, timezone.utc)
+        return pub_date
+
+    def resolve(self, field, records):
+        """Найти id авторов или групп порции одним запросом.
+
+        Уже известные значения берутся из словаря; он растёт с числом
+        разных авторов и групп, а не с размером файла.
+        """
+        known = self.authors if field == 'author' else self.groups
+        wanted = {record.get(field) for record in records
+                  if isinstance(record.get(field), str)}
+        wanted = {value for value in wanted if value and value not in known}
+        if not wanted:
+            return
+        if field == 'author':
+            found = User.objects.filter(username__in=wanted).values_list(
+                'username', 'id')
+        else:
+            found = Group.objects.filter(slug__in=wanted).values_list(
+                'slug', 'id')
+        known.update(found)
+        missing = wanted - set(known)
+        if missing and self.create_missing:
+            if field == 'author':
+                User.objects.bulk_create(
+                    User(username=name, password=self.unusable_password)
+                    for name in missing)
+                known.update(User.objects.filter(username__in=missing)
+                             .values_list('username', 'id'))
+            else:
+                Group.objects.bulk_create(
+                    Group(title=slug, slug=slug, description='')
+                    for slug in missing)
+                known.update(Group.objects.filter(slug__in=missing)
+                             .values_list('slug', 'id'))
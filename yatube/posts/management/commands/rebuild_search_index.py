@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестроить полнотекстовый индекс постов порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько постов индексировать за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_index(options['batch_size'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс перестроен, постов: {total}'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import find_mismatches, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитать или проверить счётчики постов авторов и групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = find_mismatches()
+            for obj, stored, actual in mismatches:
+                self.stdout.write(f'{obj!r}: {stored} != {actual}')
+            if mismatches:
+                raise CommandError(
+                    f'Расхождений в счётчиках: {len(mismatches)}')
+            self.stdout.write(self.style.SUCCESS('Счётчики в порядке'))
+            return
+        fixed = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков: {fixed}'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.feeds import all_feeds, touch_feeds
+from posts.models import Post
+from posts.rendering import RENDERER_VERSION, render_stored
+
+
+class Command(BaseCommand):
+    help = ('Перерисовать сохранённый HTML постов после смены правил '
+            'оформления (RENDERER_VERSION).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перерисовать и посты с текущей версией.',
+        )
+
+    def handle(self, *args, **options):
+        rendered = render_stored(Post.objects.all(), options['batch_size'],
+                                 force=options['all'])
+        if rendered:
+            # Готовые страницы лент собраны со старым HTML.
+            touch_feeds([all_feeds()])
+        self.stdout.write(self.style.SUCCESS(
+            f'Перерисовано постов: {rendered} (версия {RENDERER_VERSION})'))
@@ -0,0 +1,113 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.bulk import finish_bulk_load, keep_pub_date
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+def zipf_weights(size, exponent):
+    """Веса рангов 1..size по закону Ципфа: немногие очень активны."""
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+class Command(BaseCommand):
+    help = ('Заполнить базу синтетическими пользователями, группами и '
+            'постами с неравномерным распределением.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--days', type=int, default=365,
+                            help='За сколько дней распределить посты.')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Показатель Ципфа для авторов и групп.')
+        parser.add_argument('--no-group-share', type=float, default=0.3,
+                            help='Доля постов без группы.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--password', default='password',
+                            help='Общий пароль созданных пользователей.')
+
+    def handle(self, *args, **options):
+        self.fake = Faker('ru_RU')
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+            Faker.seed(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = f'seed{random.randrange(10 ** 6)}'
+        users = self.create_users(options['users'], prefix,
+                                  options['password'])
+        groups = self.create_groups(options['groups'], prefix)
+        self.create_posts(options, users, groups)
+        finish_bulk_load()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, групп {len(groups)}, '
+            f'постов {options["posts"]}'))
+
+    def create_users(self, total, prefix, password):
+        password = make_password(password)
+        users = [
+            User(username=f'{prefix}_{i}', password=password,
+                 first_name=self.fake.first_name(),
+                 last_name=self.fake.last_name(),
+                 email=f'{prefix}_{i}@example.com')
+            for i in range(total)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        return list(User.objects.filter(username__startswith=f'{prefix}_')
+                    .values_list('id', flat=True))
+
+    def create_groups(self, total, prefix):
+        groups = [
+            Group(title=self.fake.catch_phrase()[:200],
+                  slug=f'{prefix}-{i}',
+                  description=self.fake.paragraph())
+            for i in range(total)
+        ]
+        Group.objects.bulk_create(groups, batch_size=self.batch_size)
+        return list(Group.objects.filter(slug__startswith=f'{prefix}-')
+                    .values_list('id', flat=True))
+
+    def create_posts(self, options, users, groups):
+        total = options['posts']
+        author_weights = zipf_weights(len(users), options['skew'])
+        group_weights = zipf_weights(len(groups), options['skew'])
+        no_group_share = options['no_group_share'] if groups else 1
+        now = timezone.now()
+        period = timedelta(days=options['days']).total_seconds()
+        created = 0
+        with keep_pub_date():
+            while created < total:
+                size = min(self.batch_size, total - created)
+                authors = random.choices(users, author_weights, k=size)
+                posts = []
+                for author_id in authors:
+                    group_id = None
+                    if random.random() >= no_group_share:
+                        group_id = random.choices(groups, group_weights)[0]
+                    # Квадрат смещает даты к настоящему: свежих постов
+                    # больше, как в живой ленте.
+                    age = period * random.random() ** 2
+                    post = Post(
+                        text=self.fake.paragraph(
+                            nb_sentences=random.randint(1, 12)),
+                        author_id=author_id,
+                        group_id=group_id,
+                        pub_date=now - timedelta(seconds=age),
+                    )
+                    post.render_text()
+                    posts.append(post)
+                with transaction.atomic():
+                    Post.objects.bulk_create(posts)
+                created += size
+                self.stdout.write(f'Постов: {created}/{total}')
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorCounter = apps.get_model('posts', 'AuthorCounter')
+    totals = Post.objects.order_by().values('author', 'group').annotate(
+        total=Count('id'))
+    authors, groups = {}, {}
+    for row in totals:
+        authors[row['author']] = authors.get(row['author'], 0) + row['total']
+        if row['group'] is not None:
+            groups[row['group']] = groups.get(row['group'], 0) + row['total']
+    AuthorCounter.objects.bulk_create([
+        AuthorCounter(author_id=author_id, posts_count=total)
+        for author_id, total in authors.items()
+    ])
+    for group_id, total in groups.items():
+        Group.objects.filter(pk=group_id).update(posts_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0002_auto_20220623_1107'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorCounter',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
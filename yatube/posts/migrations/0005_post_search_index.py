@@ -0,0 +1,55 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:05
+
+from django.db import migrations
+
+# SQL полнотекстового индекса на момент этой миграции. Копия, а не
+# импорт posts.search: история миграций не должна меняться вместе
+# с кодом приложения.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+    "text, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai AFTER INSERT "
+    "ON posts_post BEGIN INSERT INTO posts_post_fts(rowid, text) "
+    "VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad AFTER DELETE "
+    "ON posts_post BEGIN DELETE FROM posts_post_fts "
+    "WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_au AFTER UPDATE OF text "
+    "ON posts_post BEGIN UPDATE posts_post_fts SET text = new.text "
+    "WHERE rowid = new.id; END",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS posts_post_fts_au',
+    'DROP TRIGGER IF EXISTS posts_post_fts_ad',
+    'DROP TRIGGER IF EXISTS posts_post_fts_ai',
+    'DROP TABLE IF EXISTS posts_post_fts',
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+    schema_editor.execute(
+        'INSERT INTO posts_post_fts(rowid, text) '
+        'SELECT id, text FROM posts_post')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
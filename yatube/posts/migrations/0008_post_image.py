@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+# SQL полнотекстового индекса на момент этой миграции. Копия, а не
+# импорт posts.search: история миграций не должна меняться вместе
+# с кодом приложения.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+    "text, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai AFTER INSERT "
+    "ON posts_post BEGIN INSERT INTO posts_post_fts(rowid, text) "
+    "VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad AFTER DELETE "
+    "ON posts_post BEGIN DELETE FROM posts_post_fts "
+    "WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_au AFTER UPDATE OF text "
+    "ON posts_post BEGIN UPDATE posts_post_fts SET text = new.text "
+    "WHERE rowid = new.id; END",
+)
+
+
+def restore_triggers(apps, schema_editor):
+    # Пересоздание таблицы в SQLite удаляет триггеры полнотекстового
+    # индекса.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 2.2.16 on 2026-10-18 23:10
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+
+# SQL полнотекстового индекса на момент этой миграции. Копия, а не
+# импорт posts.search: история миграций не должна меняться вместе
+# с кодом приложения.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+    "text, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai AFTER INSERT "
+    "ON posts_post BEGIN INSERT INTO posts_post_fts(rowid, text) "
+    "VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad AFTER DELETE "
+    "ON posts_post BEGIN DELETE FROM posts_post_fts "
+    "WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_au AFTER UPDATE OF text "
+    "ON posts_post BEGIN UPDATE posts_post_fts SET text = new.text "
+    "WHERE rowid = new.id; END",
+)
+
+
+def restore_triggers(apps, schema_editor):
+    # Пересоздание таблицы в SQLite удаляет триггеры полнотекстового
+    # индекса.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+# Правила оформления на момент миграции: posts.rendering версии 1.
+# Посты с другой версией потом перерисует render_posts.
+RENDERER_VERSION = 1
+
+
+def render_posts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = (Post.objects.using(schema_editor.connection.alias)
+             .order_by('pk').only('pk', 'text'))
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:500])
+        if not batch:
+            return
+        for post in batch:
+            post.text_html = linebreaksbr(post.text, autoescape=True)
+            post.text_html_version = RENDERER_VERSION
+        posts.bulk_update(batch, ('text_html', 'text_html_version'))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
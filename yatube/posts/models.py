@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.safestring import mark_safe
+
+from .rendering import RENDERER_VERSION, render_text
 
 User = get_user_model()
 
@@ -15,6 +18,13 @@ class Group(models.Model):
         blank=True,
         null=True,
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
 
     def __str__(self):
         return f'{self.title}'
@@ -29,6 +39,9 @@ class Post(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -41,9 +54,126 @@ class Post(models.Model):
         null=True,
         related_name=RELATED_NAME,
     )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+    )
+    text_html = models.TextField(
+        default='',
+        editable=False,
+    )
+    text_html_version = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('pub_date', 'id'),
+                         name='post_pub_date_id_idx'),
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=('group', 'pub_date'),
+                         name='post_group_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.render_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'text_html', 'text_html_version'}
+        super().save(*args, **kwargs)
+
+    def render_text(self):
+        """Сохранить HTML текста; bulk_create save() не вызывает."""
+        self.text_html = render_text(self.text)
+        self.text_html_version = RENDERER_VERSION
+
+    @property
+    def text_as_html(self):
+        """Готовый HTML текста или, если правила сменились, свежий."""
+        if self.text_html_version != RENDERER_VERSION:
+            return render_text(self.text)
+        return mark_safe(self.text_html)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_counted_fields()
+        return instance
+
+    def remember_counted_fields(self):
+        """Запомнить автора и группу, под которыми пост учтён в счётчиках.
+
+        Отложенные поля (only(), defer()) не запоминаются: их прежние
+        значения перед сохранением читаются из БД.
+        """
+        self._counted = {
+            field: self.__dict__[field]
+            for field in ('author_id', 'group_id')
+            if field in self.__dict__
+        }
+
+
+class AuthorCounter(models.Model):
+    """Денормализованное число постов автора."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+def author_posts_count(user):
+    """Число постов автора из счётчика, без COUNT(*) по постам."""
+    try:
+        return user.post_counter.posts_count
+    except AuthorCounter.DoesNotExist:
+        return 0
+
+
+class FeedMarker(models.Model):
+    """Время последнего изменения ленты: 'index', 'group:<slug>' и т.п."""
+    key = models.CharField(
+        max_length=200,
+        primary_key=True,
+    )
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.key}: {self.changed_at}'
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько записей источника уже загружено командой import_posts.
+
+    Обновляется в одной транзакции с очередной порцией постов, поэтому
+    после сбоя загрузка продолжается ровно с первой незаписанной строки.
+    """
+    source = models.CharField(
+        max_length=255,
+        primary_key=True,
+    )
+    position = models.BigIntegerField(
+        default=0,
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    def __str__(self):
+        return f'{self.source}: {self.position}'
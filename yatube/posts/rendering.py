@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.template.defaultfilters import linebreaksbr
+
+# Увеличивается при любой правке правил оформления: посты со старой
+# версией показываются через render_text(), пока render_posts их не
+# перерисует.
+RENDERER_VERSION = 1
+
+
+def render_text(text):
+    """HTML тела поста: экранированный текст, переводы строк — <br>."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def render_stored(posts, batch_size=500, force=False):
+    """Перерисовать сохранённый HTML постов порциями. Вернуть их число.
+
+    Посты с текущей версией пропускаются, если не задан force. Работает
+    и с моделью из миграции, поэтому обходится без методов Post.
+    """
+    if not force:
+        posts = posts.exclude(text_html_version=RENDERER_VERSION)
+    posts = posts.order_by('pk').only('pk', 'text')
+    manager = posts.model._base_manager.db_manager(posts.db)
+    rendered = last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return rendered
+        for post in batch:
+            post.text_html = render_text(post.text)
+            post.text_html_version = RENDERER_VERSION
+        with transaction.atomic(using=posts.db):
+            manager.bulk_update(batch, ('text_html', 'text_html_version'))
+        rendered += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,130 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'posts_post_fts'
+TOKEN_RE = re.compile(r'\w+')
+
+CREATE_SQL = (
+    # Индекс хранит свою копию текста, поэтому строку можно удалить по
+    # rowid, не зная, какой текст был проиндексирован. Триггеры обновляют
+    # индекс в той же транзакции, что и запись поста, — в том числе для
+    # bulk_create и update().
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT "
+    f"ON posts_post BEGIN INSERT INTO {FTS_TABLE}(rowid, text) "
+    f"VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE "
+    f"ON posts_post BEGIN DELETE FROM {FTS_TABLE} "
+    f"WHERE rowid = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF text "
+    f"ON posts_post BEGIN UPDATE {FTS_TABLE} SET text = new.text "
+    f"WHERE rowid = new.id; END",
+)
+
+
+def create_index(apps=None, schema_editor=None):
+    """Создать таблицу индекса и триггеры, если их нет.
+
+    SQLite пересоздаёт таблицу при многих изменениях схемы, и триггеры
+    posts_post при этом пропадают. Поэтому каждая миграция, меняющая
+    posts_post, восстанавливает их через RunPython — своей копией SQL,
+    а не этой функцией, чтобы история миграций не зависела от кода.
+    Что триггеры остались после migrate, проверяет test_search.
+    """
+    db = schema_editor.connection if schema_editor else connection
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        for statement in CREATE_SQL:
+            cursor.execute(statement)
+
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def has_index():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Запрос пользователя в выражение FTS5: все слова, по префиксу.
+
+    Каждое слово берётся в кавычки, поэтому операторы и спецсимволы
+    FTS5 во вводе не ломают запрос.
+    """
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+
+def search_posts(queryset, query):
+    """Посты из queryset, содержащие все слова запроса, по релевантности."""
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not has_index():
+        for token in TOKEN_RE.findall(query):
+            queryset = queryset.filter(text__icontains=token)
+        return queryset
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = posts_post.id',
+               f'{FTS_TABLE} MATCH %s'],
+        params=[expression],
+        select={'rank': f'{FTS_TABLE}.rank'},
+        order_by=['rank', '-pub_date'],
+    )
+
+
+def filter_posts(queryset, query):
+    """Как search_posts, но без своей сортировки (для админки)."""
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not has_index():
+        return search_posts(queryset, query)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [expression],
+    ))
+
+
+def rebuild_index(batch_size=1000, stdout=None):
+    """Перестроить индекс порциями по id, каждая в своей транзакции.
+
+    Между порциями блокировка записи отпускается, поэтому авторы
+    постов не ждут окончания всей перестройки. Посты, записанные во
+    время прохода, попадают в индекс через триггеры.
+    """
+    if not has_index():
+        return 0
+    create_index()
+    last_id, total = 0, 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT max(id), count(*) FROM (SELECT id FROM posts_post '
+                'WHERE id > %s ORDER BY id LIMIT %s)', [last_id, batch_size])
+            upper_id, rows = cursor.fetchone()
+            if upper_id is None:
+                # Хвост индекса без постов — удалённые мимо триггеров.
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} WHERE rowid > %s', [last_id])
+                return total
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid > %s AND rowid <= %s',
+                [last_id, upper_id])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, text) SELECT id, text '
+                f'FROM posts_post WHERE id > %s AND id <= %s',
+                [last_id, upper_id])
+        last_id = upper_id
+        total += rows
+        if stdout is not None:
+            stdout.write(f'Проиндексировано постов: {total}')
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.paginator import invalidate_counts
+
+from . import counters, feeds, thumbnails
+from .models import Group, Post
+
+User = get_user_model()
+
+
+def touch_on_commit(keys):
+    # Отметка ставится после коммита: иначе читатель успел бы закэшировать
+    # старое содержимое под новой версией ленты.
+    transaction.on_commit(lambda: feeds.touch_feeds(keys))
+
+
+@receiver(pre_save, sender=Post)
+def load_counted_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        counters.load_counted(instance)
+
+
+# Обработчик лент подключается раньше счётчиков: тем нужны прежние
+# автор и группа поста, а счётчики их перезаписывают.
+@receiver(post_save, sender=Post)
+def touch_feeds_on_save(sender, instance, created, raw=False, **kwargs):
+    counted = {} if created else getattr(instance, '_counted', {})
+    touch_on_commit(feeds.post_feeds(
+        instance, counted.get('author_id'), counted.get('group_id')))
+
+
+@receiver(post_delete, sender=Post)
+def touch_feeds_on_delete(sender, instance, **kwargs):
+    touch_on_commit(feeds.post_feeds(instance))
+
+
+@receiver(post_save, sender=Group)
+def touch_feeds_on_group_save(sender, instance, **kwargs):
+    # Название группы выводится и в общей ленте.
+    touch_on_commit({feeds.index_feed(), feeds.group_feed(instance.slug)})
+
+
+# Поля пользователя, которые выводятся в карточках постов во всех лентах.
+SHOWN_USER_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=User)
+def remember_shown_user_fields(sender, instance, update_fields=None,
+                               raw=False, **kwargs):
+    instance._shown_fields = None
+    if raw or instance.pk is None:
+        return
+    if update_fields and not set(update_fields) & set(SHOWN_USER_FIELDS):
+        return
+    instance._shown_fields = (User.objects.filter(pk=instance.pk)
+                              .values(*SHOWN_USER_FIELDS).first())
+
+
+@receiver(post_save, sender=User)
+def touch_feeds_on_user_save(sender, instance, update_fields=None,
+                             **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    keys = {feeds.profile_feed(instance.username)}
+    shown = getattr(instance, '_shown_fields', None)
+    if shown and any(shown[field] != getattr(instance, field)
+                     for field in SHOWN_USER_FIELDS):
+        # Имя автора есть в карточках общей ленты и групп, где он писал;
+        # страницы его постов зависят от ленты профиля.
+        keys.update((feeds.index_feed(),
+                     feeds.profile_feed(shown['username'])))
+        keys.update(feeds.group_feed(slug) for slug in
+                    Group.objects.filter(posts__author=instance)
+                    .values_list('slug', flat=True).distinct())
+    touch_on_commit(keys)
+
+
+@receiver(post_save, sender=Post)
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        counters.post_saved(instance, created)
+    invalidate_counts()
+
+
+@receiver(post_delete, sender=Post)
+def update_counters_on_delete(sender, instance, **kwargs):
+    counters.post_deleted(instance)
+    invalidate_counts()
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnails_on_save(sender, instance, raw=False, **kwargs):
+    # Миниатюры готовит фоновая задача, а не первый запрос, который
+    # покажет карточку. Задача пишется в той же транзакции, что и пост.
+    if instance.image and not raw:
+        thumbnails.schedule(instance)
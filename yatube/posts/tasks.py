@@ -0,0 +1,8 @@
+from tasks.queue import task
+
+from . import thumbnails
+
+
+@task(name=thumbnails.GENERATE_TASK)
+def generate_thumbnails(post_id):
+    thumbnails.generate_thumbnails(post_id)
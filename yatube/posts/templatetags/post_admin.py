@@ -0,0 +1,49 @@
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.db.models import Max, Min
+
+from posts.admin import indexed_dates
+
+register = template.Library()
+
+
+class IndexedDatesQuerySet:
+    """QuerySet, у которого границы и dates() ищутся по индексу."""
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def __getattr__(self, name):
+        return getattr(self.queryset, name)
+
+    def aggregate(self, **aggregates):
+        # SQLite берёт MIN или MAX из индекса, только если он в запросе
+        # один; здесь каждая граница — отдельный запрос с LIMIT 1.
+        if not all(isinstance(expression, (Min, Max))
+                   for expression in aggregates.values()):
+            return self.queryset.aggregate(**aggregates)
+        result = {}
+        for alias, expression in aggregates.items():
+            field = expression.source_expressions[0].name
+            order = field if isinstance(expression, Min) else f'-{field}'
+            result[alias] = (self.queryset.order_by(order)
+                             .values_list(field, flat=True).first())
+        return result
+
+    def dates(self, field_name, kind, order='ASC'):
+        return indexed_dates(self.queryset, field_name, kind)
+
+
+class IndexedDatesChangeList:
+    def __init__(self, cl):
+        self.cl = cl
+        self.queryset = IndexedDatesQuerySet(cl.queryset)
+
+    def __getattr__(self, name):
+        return getattr(self.cl, name)
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def indexed_date_hierarchy(cl):
+    """{% date_hierarchy %} админки без DISTINCT по всей выборке."""
+    return date_hierarchy(IndexedDatesChangeList(cl))
@@ -0,0 +1,66 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts.rendering import RENDERER_VERSION
+from posts.thumbnails import ready_thumbnails, thumbnail_ratio
+
+register = template.Library()
+
+CARD_TEMPLATE = 'posts/post_place.html'
+
+
+def card_key(post):
+    """Ключ карточки: id поста и всё, что меняет её HTML.
+
+    updated_at меняется при любой правке поста, включая смену группы,
+    и когда готовы миниатюры картинки; имя автора выводится в карточке
+    и берётся в ключ напрямую. Версия правил оформления текста и
+    геометрия миниатюры сбрасывают все карточки сразу.
+    """
+    author = post.author
+    author_version = hashlib.md5(
+        f'{author.username}|{author.get_full_name()}'.encode()
+    ).hexdigest()[:12]
+    geometry = settings.POST_THUMBNAILS['card'][0]
+    return (f'post-card:{settings.LANGUAGE_CODE}:{RENDERER_VERSION}:'
+            f'{geometry}:{post.pk}:{post.updated_at.timestamp()}:'
+            f'{author_version}')
+
+
+@register.simple_tag
+def card_thumbnail_ratio():
+    """Соотношение сторон заглушки, пока миниатюра карточки не готова."""
+    return thumbnail_ratio('card')
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Пары (пост, HTML карточки) для страницы ленты.
+
+    Все карточки страницы читаются из кэша одним get_many, недостающие
+    рендерятся и записываются одним set_many. Готовность миниатюр
+    проверяется тоже разом и только для недостающих карточек.
+    """
+    posts = list(posts)
+    cache = caches[settings.FRAGMENT_CACHE_ALIAS]
+    keys = [card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missed = [(key, post) for key, post in zip(keys, posts)
+              if key not in cards]
+    thumbnails = ready_thumbnails(post for _, post in missed)
+    missing = {
+        key: render_to_string(CARD_TEMPLATE, {
+            'post': post,
+            'thumbnail': thumbnails.get(post.pk),
+        })
+        for key, post in missed
+    }
+    if missing:
+        cache.set_many(missing)
+        cards.update(missing)
+    return [(post, mark_safe(cards[key])) for key, post in zip(keys, posts)]
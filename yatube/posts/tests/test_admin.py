@@ -0,0 +1,145 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.paginator import AdminPaginator
+from posts.admin import indexed_dates
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@mail.ru', 'password')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {number}',
+                                 slug=f'group-{number}', description='')
+            for number in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def add_posts(self, count, start=None, step=40):
+        start = start or timezone.now()
+        for number in range(count):
+            post = Post.objects.create(
+                author=self.admin, text=f'Пост {number}',
+                group=self.groups[number % len(self.groups)])
+            # auto_now_add не даёт задать дату при создании.
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=start - datetime.timedelta(days=step * number))
+
+    def queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context), response
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Ни автор, ни группа, ни виджет не стоят запроса на строку."""
+        self.add_posts(3, step=0)
+        few, _ = self.queries(self.url)
+        self.add_posts(30, step=0)
+        many, response = self.queries(self.url)
+        self.assertEqual(few, many)
+        group = self.groups[0]
+        self.assertContains(
+            response, f'<option value="{group.pk}" selected>{group}</option>',
+            html=True)
+
+    def test_date_hierarchy_lists_periods(self):
+        self.add_posts(12, start=timezone.make_aware(
+            datetime.datetime(2024, 12, 20)))
+        response = self.client.get(self.url)
+        for year in ('2023', '2024'):
+            self.assertContains(response, f'pub_date__year={year}')
+        response = self.client.get(self.url, {'pub_date__year': 2024})
+        self.assertContains(response, 'pub_date__month=12')
+        # Посты идут через 40 дней, в январе, мае и сентябре их нет.
+        self.assertContains(response, 'pub_date__month=2&')
+        for month in (1, 5, 9):
+            self.assertNotContains(response, f'pub_date__month={month}&')
+
+    @override_settings(ADMIN_COUNT_LIMIT=4)
+    def test_capped_count_is_shown_as_estimate(self):
+        self.add_posts(6, step=0)
+        response = self.client.get(
+            self.url, {'pub_date__year': timezone.now().year})
+        self.assertContains(response, '4+')
+        self.assertEqual(len(response.context['cl'].result_list), 6)
+
+    def test_indexed_dates_match_dates(self):
+        self.add_posts(15)
+        posts = Post.objects.filter(group=self.groups[1])
+        for kind in ('year', 'month', 'day'):
+            with self.subTest(kind=kind):
+                self.assertEqual(indexed_dates(posts, 'pub_date', kind),
+                                 list(posts.dates('pub_date', kind)))
+
+
+class AdminPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {number}') for number in range(25))
+
+    def setUp(self):
+        cache.clear()
+        self.posts = Post.objects.order_by('-pub_date', '-pk')
+
+    def test_pages_match_offset_pagination(self):
+        """Страницы по ключу и со смещением совпадают с обычными."""
+        expected = Paginator(self.posts, 10)
+        paginator = AdminPaginator(self.posts, 10, total=lambda: 25)
+        for number in (3, 1, 2, 3):
+            with self.subTest(number=number):
+                self.assertEqual(list(paginator.page(number)),
+                                 list(expected.page(number)))
+        self.assertEqual(paginator.num_pages, 3)
+
+    def test_next_page_uses_remembered_key(self):
+        paginator = AdminPaginator(self.posts, 10)
+        list(paginator.page(1))
+        with CaptureQueriesContext(connection) as context:
+            list(paginator.page(2))
+        self.assertIn('"posts_post"."pub_date" <', context[-1]['sql'])
+        self.assertNotIn('OFFSET', context[-1]['sql'])
+
+    def test_filtered_count_is_capped(self):
+        paginator = AdminPaginator(self.posts.filter(text__startswith='Пост'),
+                                   10, total=lambda: 25, count_limit=15)
+        self.assertEqual(paginator.count, 15)
+        self.assertEqual(str(paginator.count), '15+')
+        self.assertEqual(AdminPaginator(self.posts, 10,
+                                        total=lambda: 7).count, 7)
+
+    def test_pages_continue_past_capped_count(self):
+        """За оценкой страницы открываются, пока не станут пустыми."""
+        posts = self.posts.filter(text__startswith='Пост')
+        expected = Paginator(posts, 10)
+        paginator = AdminPaginator(posts, 10, count_limit=5)
+        for number in (1, 2, 3):
+            with self.subTest(number=number):
+                page = paginator.page(number)
+                self.assertEqual(list(page), list(expected.page(number)))
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.num_pages, 3)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+        # Не по ключу — со смещением, тоже за оценкой.
+        by_text = AdminPaginator(posts.order_by('text'), 10, count_limit=5)
+        self.assertEqual(len(by_text.page(3)), 5)
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+CARD_TEMPLATE = 'posts/post_place.html'
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='carder', first_name='Иван', last_name='Петров')
+        cls.group = Group.objects.create(
+            title='Карточки', slug='cards', description='')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {i}',
+                                group=cls.group)
+            for i in range(12)
+        ]
+
+    def setUp(self):
+        caches[settings.FRAGMENT_CACHE_ALIAS].clear()
+
+    def rendered_cards(self, url):
+        response = self.client.get(url)
+        names = [t.name for t in response.templates]
+        return response, names.count(CARD_TEMPLATE)
+
+    def test_cards_are_rendered_once(self):
+        """Карточки рендерятся один раз и дальше берутся из кэша."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                caches[settings.FRAGMENT_CACHE_ALIAS].clear()
+                first, rendered = self.rendered_cards(url)
+                self.assertEqual(rendered, settings.POSTS_CHIK)
+                second, rendered = self.rendered_cards(url)
+                self.assertEqual(rendered, 0)
+                self.assertEqual(first.content, second.content)
+
+    def test_page_reads_cards_with_one_get_many(self):
+        """Все карточки страницы читаются одним get_many."""
+        cache = caches[settings.FRAGMENT_CACHE_ALIAS]
+        self.client.get(reverse('posts:index'))
+        with mock.patch.object(cache, 'get_many',
+                               wraps=cache.get_many) as get_many:
+            self.client.get(reverse('posts:index'))
+        self.assertEqual(get_many.call_count, 1)
+        self.assertEqual(len(get_many.call_args[0][0]), settings.POSTS_CHIK)
+
+    def test_edit_and_author_rename_change_card(self):
+        """Правка поста и смена имени автора обновляют карточку."""
+        url = reverse('posts:index')
+        self.client.get(url)
+        post = Post.objects.get(pk=self.posts[-1].pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        self.user.first_name = 'Пётр'
+        self.user.save()
+        response, rendered = self.rendered_cards(url)
+        self.assertEqual(rendered, settings.POSTS_CHIK)
+        self.assertContains(response, 'Исправленный текст')
+        self.assertContains(response, 'Пётр Петров')
+        self.assertNotContains(response, 'Иван Петров')
+
+
+class FileBasedCardCacheTest(PostCardCacheTest):
+    """Те же проверки с файловым кэшем фрагментов."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.cache_settings = override_settings(CACHES={
+            **settings.CACHES,
+            settings.FRAGMENT_CACHE_ALIAS: {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cls.cache_dir,
+            },
+        })
+        cls.cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.cache_settings.disable()
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
@@ -0,0 +1,157 @@
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from posts.models import Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+
+class SeedAndBenchmarkCommandsTest(TestCase):
+    def test_seed_posts_creates_skewed_dataset(self):
+        """seed_posts создаёт данные и сводит счётчики."""
+        call_command('seed_posts', users=20, groups=4, posts=300,
+                     batch_size=64, seed=1, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Group.objects.count(), 4)
+        per_author = Post.objects.order_by().values('author').annotate(
+            total=Count('id')).values_list('total', flat=True)
+        self.assertGreater(max(per_author), 2 * 300 / 20)
+        dates = Post.objects.values_list('pub_date', flat=True)
+        self.assertGreater(max(dates) - min(dates), timedelta(days=1))
+        call_command('recount_posts', '--check', stdout=StringIO())
+
+    def test_benchmark_reports_every_page(self):
+        """benchmark выдаёт JSON со всеми страницами posts, users, about."""
+        call_command('seed_posts', users=5, groups=2, posts=30,
+                     seed=2, stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark', requests=2, warmup=0, stdout=out)
+        results = json.loads(out.getvalue())['results']
+        self.assertIn('posts:index', results)
+        self.assertIn('users:signup', results)
+        self.assertIn('about:tech', results)
+        self.assertTrue(results['posts:post_create']['authenticated'])
+        for name, result in results.items():
+            with self.subTest(name=name):
+                self.assertLess(result['status'], 400)
+                if result['status'] == 200:
+                    self.assertGreater(result['bytes'], 0)
+
+
+class ImportPostsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='known')
+        self.group = Group.objects.create(title='Группа', slug='known-group',
+                                          description='')
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w', encoding='utf-8') as out:
+            out.write(content)
+        return path
+
+    def jsonl(self, total):
+        return ''.join(
+            json.dumps({'text': f'Пост {i}', 'author': 'known',
+                        'group': 'known-group' if i % 2 else None,
+                        'pub_date': f'2020-01-01T00:00:{i % 60:02d}'})
+            + '\n' for i in range(total))
+
+    def test_import_jsonl_and_csv(self):
+        """Загрузка JSONL и CSV с созданием недостающих авторов и групп."""
+        jsonl = self.write('posts.jsonl',
+                           self.jsonl(25) + '\n\nбитая строка\n')
+        csv_path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            'Из CSV,new_author,new-group,2021-05-05T10:00:00\n'
+            ',known,,\n')
+        err = StringIO()
+        call_command('import_posts', jsonl, batch_size=10,
+                     stdout=StringIO(), stderr=err)
+        # Пустые строки не ошибки, битая — одна.
+        self.assertEqual(err.getvalue().count('не удалось разобрать'), 1)
+        call_command('import_posts', csv_path, '--create-missing',
+                     stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Post.objects.count(), 26)
+        self.assertEqual(self.group.posts.count(), 12)
+        post = Post.objects.get(text='Из CSV')
+        self.assertEqual(post.author.username, 'new_author')
+        self.assertEqual(post.group.slug, 'new-group')
+        self.assertEqual(post.pub_date.year, 2021)
+        call_command('recount_posts', '--check', stdout=StringIO())
+
+    def test_unknown_author_is_skipped_without_flag(self):
+        """Без --create-missing записи с неизвестным автором пропускаются."""
+        path = self.write('posts.jsonl',
+                          '{"text": "Текст", "author": "ghost"}\n')
+        err = StringIO()
+        call_command('import_posts', path, stdout=StringIO(), stderr=err)
+        self.assertEqual(Post.objects.count(), 0)
+        self.assertIn('ghost', err.getvalue())
+
+    def test_bad_rows_are_skipped_not_fatal(self):
+        """Несуществующая дата и text не строкой — ошибки своих записей."""
+        rows = [
+            {'text': 'Плохая дата', 'author': 'known',
+             'pub_date': '2021-02-30T10:00:00'},
+            {'text': 42, 'author': 'known'},
+            {'text': ['список'], 'author': 'known'},
+            {'text': 'Хороший', 'author': 'known',
+             'pub_date': '2021-02-28T10:00:00'},
+        ]
+        path = self.write('posts.jsonl', ''.join(
+            json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+        err = StringIO()
+        call_command('import_posts', path, stdout=StringIO(), stderr=err)
+        self.assertEqual(list(Post.objects.values_list('text', flat=True)),
+                         ['Хороший'])
+        self.assertIn('Запись 0: неверная дата', err.getvalue())
+        self.assertIn('Запись 1: text не строка', err.getvalue())
+        self.assertIn('Запись 2: text не строка', err.getvalue())
+
+    def test_resume_after_crash(self):
+        """После сбоя загрузка продолжается с контрольной точки."""
+        path = self.write('posts.jsonl', self.jsonl(35))
+        original = Post.objects.bulk_create
+        calls = []
+
+        def crash_on_third_batch(objs, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 3:
+                raise RuntimeError('сбой')
+            return original(objs, *args, **kwargs)
+
+        with mock.patch.object(Post.objects, 'bulk_create',
+                               side_effect=crash_on_third_batch):
+            with self.assertRaises(RuntimeError):
+                call_command('import_posts', path, batch_size=10,
+                             stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertEqual(
+            ImportCheckpoint.objects.get(source=path).position, 20)
+        call_command('import_posts', path, batch_size=10, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 35)
+        self.assertEqual(
+            len(set(Post.objects.values_list('text', flat=True))), 35)
+
+    def test_stdin_imports_start_from_the_beginning(self):
+        """Законченная загрузка не оставляет точки для следующего stdin."""
+        for total in (5, 3):
+            stdin = io.TextIOWrapper(io.BytesIO(self.jsonl(total).encode()))
+            with mock.patch('sys.stdin', stdin):
+                call_command('import_posts', '-', stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 8)
+        self.assertFalse(ImportCheckpoint.objects.exists())
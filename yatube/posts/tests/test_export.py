@@ -0,0 +1,86 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(EXPORT_CHUNK_SIZE=7)
+class PostExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='exporter')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.moderator = User.objects.create_user(username='moderator',
+                                                 is_staff=True)
+        cls.group = Group.objects.create(title='Выгрузка', slug='export',
+                                         description='')
+        for i in range(30):
+            Post.objects.create(author=cls.author, text=f'Пост, "{i}"\nещё',
+                                group=cls.group if i % 3 else None)
+
+    def client_for(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def stream(self, client, url, fmt):
+        response = client.get(url, {'format': fmt})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertIn(f'.{fmt}"', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_profile_export_csv_and_jsonl(self):
+        """Автор выгружает свои посты в CSV и JSONL."""
+        client = self.client_for(self.author)
+        url = reverse('posts:profile_export', args=['exporter'])
+        body = self.stream(client, url, 'csv')
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows[0]['text'], 'Пост, "0"\nещё')
+        lines = self.stream(client, url, 'jsonl').splitlines()
+        self.assertEqual(len(lines), 30)
+        self.assertEqual(json.loads(lines[1])['group'], 'export')
+
+    def test_export_has_no_per_row_queries(self):
+        """Выгрузка — одна выборка постов без запросов на строку."""
+        client = self.client_for(self.moderator)
+        response = client.get(reverse('posts:group_export',
+                                      args=['export']))
+        with self.assertNumQueries(1):
+            body = b''.join(response.streaming_content)
+        rows = list(csv.DictReader(StringIO(body.decode())))
+        self.assertEqual(len(rows), 20)
+
+    def test_export_access(self):
+        """Чужой профиль и группу выгрузить нельзя, гостя просят войти."""
+        profile_url = reverse('posts:profile_export', args=['exporter'])
+        group_url = reverse('posts:group_export', args=['export'])
+        stranger = self.client_for(self.stranger)
+        self.assertRedirects(
+            stranger.get(profile_url),
+            reverse('posts:profile', args=['exporter']))
+        self.assertRedirects(
+            stranger.get(group_url),
+            reverse('posts:group_list', args=['export']))
+        response = self.client.get(profile_url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('users:login'), response['Location'])
+
+    def test_export_command(self):
+        """export_posts выгружает посты группы в stdout."""
+        out = StringIO()
+        call_command('export_posts', '--group', 'export', stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 20)
+        self.assertEqual([row['id'] for row in rows],
+                         sorted(row['id'] for row in rows))
@@ -0,0 +1,167 @@
+import datetime
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import FeedMarker, Group, Post
+
+User = get_user_model()
+
+
+class FeedConditionalGetTest(TransactionTestCase):
+    """Отметки лент ставятся после коммита, поэтому TransactionTestCase."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='writer')
+        self.other = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Первая', slug='first', description='')
+        self.other_group = Group.objects.create(
+            title='Вторая', slug='second', description='')
+        self.post = Post.objects.create(
+            author=self.user, text='Текст', group=self.group)
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+        self.urls = {
+            'index': reverse('posts:index'),
+            'first': reverse('posts:group_list', args=['first']),
+            'second': reverse('posts:group_list', args=['second']),
+            'writer': reverse('posts:profile', args=['writer']),
+            'reader': reverse('posts:profile', args=['reader']),
+            'detail': reverse('posts:post_detail', args=[self.post.id]),
+        }
+
+    def etags(self):
+        return {name: self.client.get(url)['ETag']
+                for name, url in self.urls.items()}
+
+    def changed(self, before):
+        after = self.etags()
+        return {name for name in before if before[name] != after[name]}
+
+    def test_matching_etag_returns_304_without_queries(self):
+        """Актуальный If-None-Match даёт 304 без запросов ленты."""
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Last-Modified', response)
+                with self.assertNumQueries(0 if 'posts/' not in url else 1):
+                    cached = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(cached.status_code, 304)
+
+    def test_etag_depends_on_user(self):
+        """Гость и автор получают разные ETag одной страницы."""
+        url = self.urls['index']
+        self.assertNotEqual(self.client.get(url)['ETag'],
+                            self.author_client.get(url)['ETag'])
+
+    def test_create_touches_index_group_and_profile(self):
+        """Новый пост меняет общую ленту, свою группу и профиль автора."""
+        before = self.etags()
+        self.author_client.post(reverse('posts:post_create'),
+                                {'text': 'Ещё пост', 'group': self.group.id})
+        self.assertEqual(self.changed(before),
+                         {'index', 'first', 'writer', 'detail'})
+
+    def test_edit_touches_old_and_new_group(self):
+        """Перенос поста в другую группу меняет обе группы."""
+        before = self.etags()
+        self.author_client.post(
+            reverse('posts:post_edit', args=[self.post.id]),
+            {'text': 'Новый текст', 'group': self.other_group.id})
+        self.assertEqual(self.changed(before),
+                         {'index', 'first', 'second', 'writer', 'detail'})
+
+    def test_author_rename_changes_feeds_with_cards(self):
+        """Новое имя автора меняет ленты, где видны его карточки."""
+        url = self.urls['index']
+        etag = self.client.get(url)['ETag']
+        before = self.etags()
+        self.user.first_name = 'Новое'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Новое')
+        self.assertEqual(self.changed(before),
+                         {'index', 'first', 'writer', 'detail'})
+
+    def test_reads_do_not_create_markers(self):
+        """Чтение несуществующих лент ничего не пишет в БД."""
+        count = FeedMarker.objects.count()
+        for number in range(5):
+            for url in (reverse('posts:group_list', args=[f'nope-{number}']),
+                        reverse('posts:profile', args=[f'nobody-{number}'])):
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.get(self.urls['second'])
+        self.assertEqual(FeedMarker.objects.count(), count)
+
+    def test_render_posts_changes_every_feed(self):
+        """Новое оформление меняет и ленты, в которые ещё не писали."""
+        FeedMarker.objects.filter(key='group:second').delete()
+        cache.clear()
+        before = self.etags()
+        call_command('render_posts', all=True, stdout=StringIO())
+        self.assertEqual(self.changed(before), set(self.urls))
+
+    @override_settings(PAGE_CACHE_ENABLED=True, FEED_MARKER_TIMEOUT=1)
+    def test_marker_changed_by_other_process_is_seen(self):
+        """Отметку, изменённую в обход кэша процесса, видно после срока."""
+        # setUp закэшировал отметки со сроком по умолчанию.
+        cache.clear()
+        url = self.urls['index']
+        etag = self.client.get(url)['ETag']
+        FeedMarker.objects.filter(key='index').update(
+            changed_at=FeedMarker.objects.get(key='index').changed_at
+            + datetime.timedelta(seconds=1))
+        time.sleep(1.1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_guest_pages_come_from_cache_until_write(self):
+        """Гость получает страницу из кэша, пока лента не изменилась."""
+        url = self.urls['index']
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, 'Текст')
+        Post.objects.create(author=self.other, text='Свежий пост')
+        self.assertContains(self.client.get(url), 'Свежий пост')
+        self.assertIsNotNone(self.author_client.get(url).context)
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_member_pages_share_body_with_own_header(self):
+        """Вошедшие получают общее тело из кэша и свою шапку."""
+        reader_client = Client()
+        reader_client.force_login(self.other)
+        url = self.urls['index']
+        reader_client.get(url)
+        self.author_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.author_client.get(url)
+        self.assertContains(response, 'Текст')
+        self.assertContains(response, 'Пользователь: writer')
+        self.assertNotContains(response, 'Пользователь: reader')
+        self.assertNotContains(response, '<!-- hole:')
+        self.assertTemplateNotUsed(response, 'posts/index.html')
+        self.assertTemplateUsed(response, 'includes/header.html')
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_owner_and_reader_get_own_body(self):
+        """Ссылки на выгрузку видит только владелец профиля."""
+        reader_client = Client()
+        reader_client.force_login(self.other)
+        url = self.urls['writer']
+        for _ in range(2):
+            self.assertContains(self.author_client.get(url), 'format=csv')
+            self.assertNotContains(reader_client.get(url), 'format=csv')
@@ -0,0 +1,57 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from core.benchmark import histogram
+from core.management.commands.loadtest import parse_mix
+from posts.models import Post
+
+User = get_user_model()
+
+
+class LoadTestCommandTest(TransactionTestCase):
+    def test_reports_endpoints_and_cleans_up(self):
+        author = User.objects.create_user(username='reader')
+        Post.objects.create(text='Пост для чтения', author=author)
+        # Чужая учётная запись с похожим именем остаётся нетронутой.
+        namesake = User.objects.create_user(username='loadtest-0',
+                                            password='own-Password1')
+        Post.objects.create(text='Настоящий пост', author=namesake)
+        out = StringIO()
+        # Общая тестовая база в памяти не ждёт блокировок, поэтому
+        # запросы идут по одному.
+        call_command('loadtest', workers=1, users=1, duration=1,
+                     mix='anon_read=1,auth_read=1,login=1,create=1',
+                     stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['setup_errors'], 0)
+        self.assertEqual(report['errors'], 0)
+        self.assertGreater(report['requests'], 0)
+        for key, endpoint in report['endpoints'].items():
+            with self.subTest(endpoint=key):
+                self.assertIn(key.split()[0], report['mix'])
+                self.assertEqual(sum(endpoint['histogram'].values()),
+                                 endpoint['requests'])
+                self.assertEqual(endpoint['latency']['count'],
+                                 endpoint['requests'])
+        self.assertEqual(list(User.objects.order_by('pk')),
+                         [author, namesake])
+        self.assertTrue(User.objects.get(pk=namesake.pk)
+                        .check_password('own-Password1'))
+        self.assertEqual(Post.objects.count(), 2)
+
+
+class LoadTestHelpersTest(SimpleTestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('anon_read=3, create'),
+                         {'anon_read': 3.0, 'create': 1.0})
+        for value in ('reads=1', 'login=x', 'login=0'):
+            with self.subTest(value=value), self.assertRaises(CommandError):
+                parse_mix(value)
+
+    def test_histogram(self):
+        self.assertEqual(histogram([0.0005, 0.001, 0.0015, 0.3, 9]), {
+            '<=1ms': 2, '<=2ms': 1, '<=500ms': 1, '>5000ms': 1})
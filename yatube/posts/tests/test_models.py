@@ -1,9 +1,13 @@
+from io import StringIO
+
 from faker import Faker
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 from django.conf import settings
 
-from ..models import Group, Post
+from ..models import Group, Post, author_posts_count
 
 fake = Faker()
 User = get_user_model()
@@ -35,3 +39,76 @@ class PostModelTest(TestCase):
         for field, expected_value in field_str.items():
             with self.subTest(field=field):
                 self.assertEqual(field, expected_value)
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='counter')
+        cls.group = Group.objects.create(
+            title='Первая', slug='first', description='')
+        cls.other_group = Group.objects.create(
+            title='Вторая', slug='second', description='')
+
+    def assertCounts(self, author, group, other_group):
+        self.user.refresh_from_db()
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(author_posts_count(self.user), author)
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.other_group.posts_count, other_group)
+
+    def test_counters_follow_create_move_and_delete(self):
+        """Счётчики меняются при создании, смене группы и удалении."""
+        post = Post.objects.create(author=self.user, text=fake.text(),
+                                   group=self.group)
+        Post.objects.create(author=self.user, text=fake.text())
+        self.assertCounts(2, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        post.save()
+        self.assertCounts(2, 0, 1)
+        post.delete()
+        self.assertCounts(1, 0, 0)
+
+    def test_save_of_untracked_instance_is_not_counted_twice(self):
+        """Пост из only(), raw() или собранный вручную не считается дважды."""
+        post = Post.objects.create(author=self.user, text=fake.text(),
+                                   group=self.group)
+        self.assertCounts(1, 1, 0)
+        deferred = Post.objects.only('text').get(pk=post.pk)
+        deferred.text = fake.text()
+        deferred.save()
+        raw = Post.objects.raw('SELECT id, text FROM posts_post')[0]
+        raw.save()
+        self.assertCounts(1, 1, 0)
+        moved = Post.objects.only('text').get(pk=post.pk)
+        moved.group = self.other_group
+        moved.save()
+        self.assertCounts(1, 0, 1)
+        Post(pk=post.pk, author=self.user, text=post.text,
+             pub_date=post.pub_date).save()
+        self.assertCounts(1, 0, 0)
+
+    def test_delete_with_drifted_counter(self):
+        """Отставший счётчик не срывает удаление и не уходит ниже нуля."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text=fake.text(), group=self.group)])
+        self.assertCounts(0, 0, 0)
+        Post.objects.get(author=self.user).delete()
+        self.assertFalse(Post.objects.exists())
+        self.assertCounts(0, 0, 0)
+
+    def test_recount_command_fixes_drift(self):
+        """recount_posts находит и исправляет расхождения."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text=fake.text(), group=self.group)
+            for _ in range(3)
+        ])
+        with self.assertRaises(CommandError):
+            call_command('recount_posts', '--check', stdout=StringIO())
+        call_command('recount_posts', stdout=StringIO())
+        call_command('recount_posts', '--check', stdout=StringIO())
+        self.assertCounts(3, 3, 0)
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings = override_settings(PROFILING_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+        self.url = reverse('posts:index')
+
+    def saved(self):
+        directory = os.path.join(self.directory, 'posts.index')
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.listdir(directory))
+
+    def test_staff_request_is_profiled(self):
+        response = self.staff_client.get(self.url, {'_profile': '1'})
+        name = response['X-Profile-File']
+        self.assertTrue(name.startswith('posts.index' + os.sep))
+        self.assertEqual([os.path.splitext(file)[1] for file in self.saved()],
+                         ['.prof', '.txt'])
+        with open(os.path.join(self.directory, name + '.txt')) as summary:
+            text = summary.read()
+        self.assertIn('view: posts:index', text)
+        self.assertIn('function calls', text)
+        self.assertNotIn('Память по строкам', text)
+
+    def test_header_and_memory_mode(self):
+        response = self.staff_client.get(self.url, HTTP_X_PROFILE='memory')
+        path = os.path.join(self.directory,
+                            response['X-Profile-File'] + '.txt')
+        with open(path) as summary:
+            self.assertIn('Память по строкам', summary.read())
+
+    def test_others_are_not_profiled(self):
+        user_client = Client()
+        user_client.force_login(self.user)
+        responses = (
+            user_client.get(self.url, {'_profile': '1'}),
+            self.client.get(self.url, HTTP_X_PROFILE='1'),
+            self.staff_client.get(self.url),
+        )
+        for response in responses:
+            self.assertFalse(response.has_header('X-Profile-File'))
+        self.assertEqual(self.saved(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampling(self):
+        response = Client().get(self.url)
+        self.assertTrue(response.has_header('X-Profile-File'))
+
+    def test_profile_report_aggregates_view(self):
+        for _ in range(2):
+            self.staff_client.get(self.url, {'_profile': '1'})
+        out = StringIO()
+        call_command('profile_report', stdout=out)
+        self.assertEqual(out.getvalue(), 'posts:index\t2\n')
+        out = StringIO()
+        call_command('profile_report', 'posts:index', limit=5, stdout=out)
+        self.assertIn('tottime', out.getvalue())
+        self.assertIn('Профилей: 2', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('profile_report', 'posts:profile', stdout=out)
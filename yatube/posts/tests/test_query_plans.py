@@ -0,0 +1,83 @@
+from faker import Faker
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+fake = Faker()
+User = get_user_model()
+
+FEED_INDEXES = {
+    'index': 'post_pub_date_id_idx',
+    'group_list': 'post_group_pub_date_idx',
+    'profile': 'post_author_pub_date_idx',
+}
+
+
+def plan_problems(plan):
+    """Шаги плана с полным сканом таблицы или сортировкой во временном
+    B-дереве."""
+    return [
+        step for step in plan
+        if 'TEMP B-TREE' in step
+        or (step.startswith(('SCAN TABLE posts_post', 'SCAN posts_post'))
+            and 'INDEX' not in step)
+    ]
+
+
+class FeedQueryPlanTest(TestCase):
+    """Запросы лент идут по индексам, без полного скана и сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='planner')
+        cls.group = Group.objects.create(
+            title='Планы', slug='plans', description='')
+        Post.objects.bulk_create([
+            Post(author=cls.user, text=fake.text(), group=cls.group)
+            for _ in range(30)
+        ])
+
+    def feed_plans(self, url, data=None):
+        """Планы SELECT-ов ленты из posts_post, выполненных при запросе.
+
+        COUNT(*) пагинатора не проверяется: он читает всё подмножество
+        по определению.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data)
+        plans = {}
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if (not sql.startswith('SELECT "posts_post"."id"')
+                        or 'ORDER BY' not in sql):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans[sql] = [row[-1] for row in cursor.fetchall()]
+        return response, plans
+
+    def test_feed_queries_use_indexes(self):
+        """index, group_list и profile читают ленту по своим индексам."""
+        feeds = {
+            'index': reverse('posts:index'),
+            'group_list': reverse('posts:group_list',
+                                  kwargs={'slug': self.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': self.user}),
+        }
+        for name, url in feeds.items():
+            response, _ = self.feed_plans(url, {'cursor': ''})
+            next_cursor = response.context['page_obj'].next_cursor
+            for data in ({'page': 2}, {'cursor': ''},
+                         {'cursor': next_cursor}):
+                with self.subTest(url=url, data=data):
+                    _, plans = self.feed_plans(url, data)
+                    self.assertTrue(plans)
+                    for sql, plan in plans.items():
+                        self.assertEqual(plan_problems(plan), [], sql)
+                        self.assertIn(FEED_INDEXES[name], ' '.join(plan))
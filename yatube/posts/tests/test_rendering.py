@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.rendering import RENDERER_VERSION
+
+User = get_user_model()
+
+
+class PostHtmlTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='')
+
+    def create(self, text='Первая <b>строка</b>\nвторая'):
+        return Post.objects.create(author=self.author, text=text)
+
+    def test_save_stores_escaped_html(self):
+        post = Post.objects.get(pk=self.create().pk)
+        self.assertEqual(post.text_html,
+                         'Первая &lt;b&gt;строка&lt;/b&gt;<br>вторая')
+        self.assertEqual(post.text_html_version, RENDERER_VERSION)
+
+    def test_update_fields(self):
+        post = self.create()
+        post.text = 'Новый текст'
+        post.save(update_fields=['text'])
+        self.assertEqual(Post.objects.get(pk=post.pk).text_html,
+                         'Новый текст')
+        post.text = 'Не сохранится'
+        post.group = self.group
+        post.save(update_fields=['group'])
+        self.assertEqual(Post.objects.get(pk=post.pk).text_html,
+                         'Новый текст')
+
+    def test_outdated_html_is_rendered_on_the_fly(self):
+        post = self.create('a\nb')
+        Post.objects.filter(pk=post.pk).update(
+            text_html='старое', text_html_version=RENDERER_VERSION - 1)
+        self.assertEqual(Post.objects.get(pk=post.pk).text_as_html,
+                         'a<br>b')
+
+    def test_templates_output_stored_html(self):
+        post = self.create()
+        Post.objects.filter(pk=post.pk).update(text_html='<i>готовый</i>')
+        client = Client()
+        for url in (reverse('posts:index'),
+                    reverse('posts:post_detail', args=[post.pk])):
+            with self.subTest(url=url):
+                self.assertContains(client.get(url), '<i>готовый</i>')
+
+    def test_render_posts_command(self):
+        for number in range(5):
+            self.create(f'Пост {number}\nконец')
+        Post.objects.update(text_html='', text_html_version=0)
+        out = StringIO()
+        call_command('render_posts', batch_size=2, stdout=out)
+        self.assertIn('Перерисовано постов: 5', out.getvalue())
+        self.assertFalse(Post.objects.exclude(
+            text_html_version=RENDERER_VERSION).exists())
+        self.assertTrue(Post.objects.get(text__startswith='Пост 3')
+                        .text_html.endswith('<br>конец'))
+        call_command('render_posts', stdout=out)
+        self.assertIn('Перерисовано постов: 0', out.getvalue())
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.db_router import (PrimaryReplicaRouter, replicas_enabled,
+                            use_primary, use_replicas)
+from core.middleware import ReplicaRoutingMiddleware
+from posts.models import Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_use_replica_only_when_enabled(self):
+        """Вне запроса и в use_primary() чтение идёт в основную базу."""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        with use_replicas():
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            with use_primary():
+                self.assertEqual(self.router.db_for_read(Post), 'default')
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertFalse(replicas_enabled())
+
+    def test_no_replicas_configured(self):
+        with override_settings(DATABASE_REPLICAS=[]), use_replicas():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_migrations_skip_replicas(self):
+        self.assertIs(self.router.allow_migrate('replica', 'posts'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'posts'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=7)
+class ReplicaRoutingMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+        def view(request):
+            self.seen.append(replicas_enabled())
+            return HttpResponse()
+        self.middleware = ReplicaRoutingMiddleware(view)
+
+    def test_safe_request_reads_from_replica(self):
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(self.seen, [True])
+        self.assertNotIn('pin_primary', response.cookies)
+
+    def test_write_pins_client_to_primary(self):
+        """После POST клиент какое-то время читает с основной базы."""
+        response = self.middleware(self.factory.post('/create/'))
+        self.assertEqual(self.seen, [False])
+        self.assertEqual(response.cookies['pin_primary']['max-age'], 7)
+        request = self.factory.get('/')
+        request.COOKIES['pin_primary'] = '1'
+        self.middleware(request)
+        self.assertEqual(self.seen, [False, False])
+        self.assertFalse(replicas_enabled())
+
+    def test_not_used_without_replicas(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            with self.assertRaises(MiddlewareNotUsed):
+                ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+
+class ReplicateSqliteCommandTest(SimpleTestCase):
+    def test_copies_primary_into_replica(self):
+        with tempfile.TemporaryDirectory() as directory:
+            primary = os.path.join(directory, 'primary.sqlite3')
+            replica = os.path.join(directory, 'replica.sqlite3')
+            with sqlite3.connect(primary) as db:
+                db.execute('CREATE TABLE t (x INTEGER)')
+                db.executemany('INSERT INTO t VALUES (?)',
+                               [(i,) for i in range(5)])
+            db.close()
+            call_command('replicate_sqlite', once=True, lag=0.05,
+                         primary=primary, replica=[replica],
+                         stdout=StringIO())
+            db = sqlite3.connect(replica)
+            self.assertEqual(db.execute('SELECT COUNT(*) FROM t')
+                             .fetchone(), (5,))
+            db.close()
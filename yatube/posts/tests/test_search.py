@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.search import FTS_TABLE
+
+User = get_user_model()
+
+
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='seeker')
+        cls.cat = Post.objects.create(
+            author=cls.user, text='Кошка спит на диване')
+        cls.cats = Post.objects.create(
+            author=cls.user, text='Кошка, кошка и ещё раз кошка')
+        cls.dog = Post.objects.create(
+            author=cls.user, text='Собака гуляет во дворе')
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('posts:search'),
+                                   {'q': query, **params})
+        return list(response.context['page_obj'])
+
+    def test_migrations_leave_index_triggers(self):
+        """После migrate триггеры индекса на месте.
+
+        Миграция, пересоздающая posts_post в SQLite, удаляет их молча:
+        такой миграции нужен свой RunPython, восстанавливающий триггеры.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND tbl_name = 'posts_post'")
+            triggers = {name for name, in cursor.fetchall()}
+        self.assertEqual(triggers, {f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad',
+                                    f'{FTS_TABLE}_au'})
+
+    def test_search_ranks_and_ignores_case(self):
+        """Поиск без учёта регистра, более релевантные посты выше."""
+        self.assertEqual(self.search('КОШКА'), [self.cats, self.cat])
+        self.assertEqual(self.search('кош'), [self.cats, self.cat])
+        self.assertEqual(self.search('кошка диван'), [self.cat])
+        self.assertEqual(self.search(''), [])
+
+    def test_fts_syntax_in_query_is_harmless(self):
+        """Кавычки и операторы FTS5 во вводе не ломают поиск."""
+        for query in ('"', 'кошка OR', 'NEAR(', '*', 'соб-ака)'):
+            with self.subTest(query=query):
+                response = self.client.get(reverse('posts:search'),
+                                           {'q': query})
+                self.assertEqual(response.status_code, 200)
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при правке и удалении поста."""
+        dog = Post.objects.get(pk=self.dog.pk)
+        dog.text = 'Кошка прогнала собаку'
+        dog.save()
+        self.assertIn(dog, self.search('кошка'))
+        self.assertEqual(self.search('гуляет'), [])
+        Post.objects.get(pk=self.cat.pk).delete()
+        self.assertNotIn(self.cat, self.search('кошка'))
+
+    def test_admin_uses_index(self):
+        """Поиск в админке идёт через индекс."""
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('admin:posts_post_changelist'),
+                                   {'q': 'собака'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.dog])
+
+    def test_rebuild_restores_index(self):
+        """rebuild_search_index восстанавливает испорченный индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (999, 'кошка')")
+        self.assertEqual(self.search('кошка'), [])
+        call_command('rebuild_search_index', '--batch-size', '2',
+                     stdout=StringIO())
+        self.assertEqual(self.search('кошка'), [self.cats, self.cat])
+
+    def test_pagination_keeps_query(self):
+        """Ссылки пагинации сохраняют поисковый запрос."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'Кошка номер {i}')
+            for i in range(15)
+        ])
+        response = self.client.get(reverse('posts:search'), {'q': 'кошка'})
+        self.assertContains(response, 'href="?q=%D0%BA%D0%BE%D1%88%D0%BA'
+                                      '%D0%B0&amp;page=2"')
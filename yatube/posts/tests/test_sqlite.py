@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from core.sqlite import retry_on_lock
+from posts import signals
+from posts.models import Group, Post
+from posts.tests.test_thumbnails import uploaded
+
+User = get_user_model()
+
+
+class SqlitePragmasTest(TestCase):
+    def test_new_connection_is_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA synchronous')
+            # 1 — NORMAL.
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+@override_settings(SQLITE_WRITE_RETRIES=3, SQLITE_RETRY_BACKOFF=0)
+class RetryOnLockTest(TransactionTestCase):
+    def flaky(self, error, failures):
+        calls = []
+
+        @retry_on_lock
+        def write():
+            calls.append(connection.in_atomic_block)
+            if len(calls) <= failures:
+                raise OperationalError(error)
+            return 'ok'
+        return write, calls
+
+    def test_lock_errors_are_retried_in_transaction(self):
+        write, calls = self.flaky('database is locked', 2)
+        self.assertEqual(write(), 'ok')
+        self.assertEqual(calls, [True, True, True])
+
+    def test_gives_up_after_retries(self):
+        write, calls = self.flaky('database is locked', 5)
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        write, calls = self.flaky('no such table: posts_post', 1)
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+    def test_no_retry_inside_outer_transaction(self):
+        """Откатить чужую транзакцию частично нельзя — ошибка наружу."""
+        write, calls = self.flaky('database is locked', 1)
+        with self.assertRaises(OperationalError), transaction.atomic():
+            write()
+        self.assertEqual(len(calls), 1)
+
+
+@override_settings(SQLITE_RETRY_BACKOFF=0)
+class PostWriteRetryTest(TransactionTestCase):
+    """Повтор при блокировке касается только записи поста в БД."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.media = media
+        self.user = User.objects.create_user(username='writer')
+        self.first = Group.objects.create(title='Первая', slug='first',
+                                          description='')
+        self.second = Group.objects.create(title='Вторая', slug='second',
+                                           description='')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def locked_once(self):
+        """Блокировка после записи поста и его счётчиков."""
+        calls = []
+
+        def invalidate():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+        return mock.patch.object(signals, 'invalidate_counts',
+                                 side_effect=invalidate)
+
+    def group_counts(self):
+        return list(Group.objects.order_by('pk')
+                    .values_list('posts_count', flat=True))
+
+    def test_create_stores_image_once(self):
+        with self.locked_once():
+            response = self.client.post(reverse('posts:post_create'), {
+                'text': 'С картинкой', 'group': self.first.pk,
+                'image': uploaded()})
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertEqual(os.listdir(os.path.join(self.media, 'posts')),
+                         [os.path.basename(post.image.name)])
+        self.assertEqual(self.group_counts(), [1, 0])
+
+    def test_edit_retry_moves_counters_once(self):
+        post = Post.objects.create(author=self.user, text='Текст',
+                                   group=self.first)
+        with self.locked_once():
+            self.client.post(reverse('posts:post_edit', args=[post.pk]),
+                             {'text': 'Текст', 'group': self.second.pk})
+        self.assertEqual(Post.objects.get().group, self.second)
+        self.assertEqual(self.group_counts(), [0, 1])
+
+
+class BenchmarkSqliteCommandTest(TransactionTestCase):
+    def test_reports_profiles_and_cleans_up(self):
+        author = User.objects.create_user(username='writer')
+        Post.objects.create(text='Пост для чтения', author=author)
+        out = StringIO()
+        call_command('benchmark_sqlite', readers=1, writers=1,
+                     duration=0.3, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['results']), {'baseline', 'tuned'})
+        self.assertIn('speedup', report)
+        for result in report['results'].values():
+            self.assertGreater(result['requests'], 0)
+            self.assertIn('error_rate', result)
+            self.assertEqual(result['read']['count'] + result['write']
+                             ['count'], result['requests'])
+        self.assertEqual(Post.objects.count(), 1)
@@ -0,0 +1,128 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails, ready_thumbnails
+from tasks.models import Task
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+PLACEHOLDER = 'Картинка обрабатывается'
+
+
+def uploaded(name='small.gif'):
+    return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+
+class ThumbnailsMixin:
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        caches[settings.FRAGMENT_CACHE_ALIAS].clear()
+        self.user = User.objects.create_user(username='painter')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_EAGER=True)
+class PostThumbnailsTest(ThumbnailsMixin, TestCase):
+    def test_placeholder_until_thumbnail_is_ready(self):
+        """Пока миниатюры нет, карточка показывает заглушку."""
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'С картинкой',
+            'image': uploaded(),
+        })
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.startswith('posts/small'))
+        # В TestCase on_commit не срабатывает: задача ещё в очереди.
+        self.assertEqual(Task.objects.get().status, Task.QUEUED)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, PLACEHOLDER)
+
+        self.assertTrue(generate_thumbnails(post.pk))
+        thumbnail = ready_thumbnails([Post.objects.get()])[post.pk]
+        for url in (reverse('posts:index'),
+                    reverse('posts:post_detail', args=(post.pk,))):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotContains(response, PLACEHOLDER)
+                self.assertContains(response, thumbnail.url)
+        self.assertEqual((thumbnail.width, thumbnail.height), (960, 339))
+        self.assertFalse(generate_thumbnails(post.pk))
+
+    def test_placeholder_ratio_follows_settings(self):
+        """Пропорции заглушки берутся из POST_THUMBNAILS."""
+        Post.objects.create(author=self.user, text='Текст',
+                            image=uploaded())
+        for geometry, ratio in (('960x339', '960 / 339'),
+                                ('400x300', '400 / 300'),
+                                ('400', None)):
+            with self.subTest(geometry=geometry), override_settings(
+                    POST_THUMBNAILS={'card': (geometry, {})}):
+                response = self.client.get(reverse('posts:index'))
+                self.assertContains(response, PLACEHOLDER)
+                if ratio is None:
+                    self.assertNotContains(response, 'aspect-ratio')
+                else:
+                    self.assertContains(response, f'aspect-ratio: {ratio}')
+
+    def test_ready_thumbnails_reads_store_in_one_go(self):
+        posts = [Post.objects.create(text=f'Пост {i}', author=self.user,
+                                     image=uploaded(f'{i}.gif'))
+                 for i in range(3)]
+        posts.append(Post.objects.create(text='Без картинки',
+                                         author=self.user))
+        generate_thumbnails(posts[0].pk)
+        cache.clear()
+        with self.assertNumQueries(1):
+            ready = ready_thumbnails(posts)
+        self.assertEqual(set(ready), {posts[0].pk})
+        with self.assertNumQueries(0):
+            self.assertEqual(set(ready_thumbnails(posts)), {posts[0].pk})
+
+    def test_command_fills_missing_thumbnails(self):
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=self.user,
+                                image=uploaded(f'{i}.gif'))
+        Post.objects.create(text='Без картинки', author=self.user)
+        out = StringIO()
+        call_command('generate_thumbnails', workers=0, stdout=out)
+        self.assertIn('миниатюры созданы для 3', out.getvalue())
+        self.assertEqual(len(ready_thumbnails(Post.objects.all())), 3)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_EAGER=True)
+class ThumbnailsOnCommitTest(ThumbnailsMixin, TransactionTestCase):
+    def test_saved_post_gets_thumbnail_after_commit(self):
+        self.client.post(reverse('posts:post_create'), {
+            'text': 'С картинкой',
+            'image': uploaded(),
+        })
+        post = Post.objects.get()
+        self.assertIn(post.pk, ready_thumbnails([post]))
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, PLACEHOLDER)
@@ -0,0 +1,70 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(SERVER_TIMING_ENABLED=True)
+class ServerTimingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url):
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            response = self.client.get(url)
+        self.assertEqual(len(logs.records), 1)
+        return response, json.loads(logs.records[0].getMessage())
+
+    def metrics(self, response):
+        return [entry.split(';') for entry
+                in response['Server-Timing'].split(', ')]
+
+    def test_header_splits_request_into_phases(self):
+        response, _ = self.get(reverse('posts:index'))
+        names = [metric[0] for metric in self.metrics(response)]
+        self.assertEqual(
+            names[:7], ['total', 'middleware', 'resolve', 'view', 'db',
+                        'templates', 'tpl'])
+        templates = [metric[2] for metric in self.metrics(response)
+                     if metric[0] == 'tpl']
+        for name in ('posts/index.html', 'posts/post_place.html',
+                     'posts/includes/paginator.html'):
+            self.assertIn(f'desc="{name} x1"', templates)
+
+    def test_log_line(self):
+        _, line = self.get(reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertEqual(line['view'], 'posts:post_detail')
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['db_queries'], 0)
+        phases = line['phases_ms']
+        self.assertIn('serialize', phases)
+        self.assertLessEqual(phases['view'], phases['total'])
+        # Ленивые выборки выполняются в шаблоне, поэтому время БД и
+        # шаблонов может пересекаться.
+        for name in ('db', 'templates'):
+            self.assertLessEqual(phases[name], phases['view'])
+        self.assertEqual(line['templates_ms']['posts/post_detail.html']
+                         ['count'], 1)
+
+    def test_not_found(self):
+        response, line = self.get('/no/such/page/')
+        self.assertEqual(line['status'], 404)
+        self.assertIsNone(line['view'])
+        self.assertTrue(response.has_header('Server-Timing'))
+
+
+class ServerTimingDisabledTest(TestCase):
+    def test_no_header(self):
+        response = Client().get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
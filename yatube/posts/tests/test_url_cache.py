@@ -0,0 +1,74 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from django.urls import NoReverseMatch, include, path, reverse
+
+from core.url_cache import cached_reverse
+
+# URLconf для проверки сброса: та же лента под другим адресом.
+urlpatterns = [
+    path('feed/', include(([
+        path('', lambda request: HttpResponse(), name='index'),
+    ], 'posts'))),
+]
+
+
+class CachedReverseTest(SimpleTestCase):
+    def test_same_urls_as_reverse(self):
+        cases = (
+            ('posts:index', (), {}),
+            ('posts:profile', ('leo',), {}),
+            ('posts:profile', (), {'username': 'лев толстой'}),
+            ('posts:post_detail', (42,), {}),
+            ('posts:post_detail', ('42',), {}),
+            ('posts:group_list', (), {'slug': 'cats'}),
+            ('users:login', (), {}),
+        )
+        for name, args, kwargs in cases:
+            with self.subTest(name=name, args=args, kwargs=kwargs):
+                for _ in range(2):
+                    self.assertEqual(
+                        cached_reverse(name, args=args, kwargs=kwargs),
+                        reverse(name, args=args, kwargs=kwargs))
+
+    def test_errors_match_reverse(self):
+        with self.assertRaises(NoReverseMatch):
+            cached_reverse('posts:post_detail', args=['abc'])
+        with self.assertRaises(NoReverseMatch):
+            cached_reverse('posts:profile')
+        with self.assertRaises(NoReverseMatch):
+            cached_reverse('nowhere:index')
+        with self.assertRaises(ValueError):
+            cached_reverse('posts:profile', args=['leo'],
+                           kwargs={'username': 'leo'})
+
+    def test_urlconf_change_resets_cache(self):
+        self.assertEqual(cached_reverse('posts:index'), '/')
+        with override_settings(ROOT_URLCONF=__name__):
+            self.assertEqual(cached_reverse('posts:index'), '/feed/')
+        self.assertEqual(cached_reverse('posts:index'), '/')
+
+    def test_template_tag_replaces_builtin_url(self):
+        template = Template(
+            "{% url 'posts:profile' username %}|"
+            "{% url 'posts:nothing' as missing %}[{{ missing }}]")
+        self.assertEqual(template.render(Context({'username': 'leo'})),
+                         '/profile/leo/|[]')
+        with self.assertRaises(NoReverseMatch):
+            Template("{% url 'posts:nothing' %}").render(Context())
+
+
+class BenchmarkReverseCommandTest(SimpleTestCase):
+    def test_reports_speedup(self):
+        out = StringIO()
+        call_command('benchmark_reverse', number=20, repeat=1, posts=2,
+                     stdout=out)
+        results = json.loads(out.getvalue())['results']
+        self.assertIn('template', results)
+        self.assertIn('posts:post_detail', results)
+        for result in results.values():
+            self.assertGreater(result['cached_us'], 0)
@@ -1,11 +1,18 @@
 import random
 from faker import Faker
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import Client, TestCase, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 from django.conf import settings
 
+from core.sql_budget import QueryBudgetExceeded, record_queries
+from core.testing import QueryBudgetTestMixin
 from posts.models import Group, Post
 
 fake = Faker()
@@ -145,3 +152,212 @@ class PaginatorViewsTest(TestCase):
                 self.assertEqual(
                     len(response_two_page.context['page_obj']),
                     count_post_two_page)
+
+
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CursorUser')
+        cls.group = Group.objects.create(
+            title='Группа для курсоров',
+            slug='cursor-slug',
+            description='Тестовое описание')
+        Post.objects.bulk_create([
+            Post(text=fake.text(), author=cls.user, group=cls.group)
+            for _ in range(settings.POSTS_CHIK * 2 + 5)
+        ])
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user}),
+        )
+
+    def walk(self, url, cursor=''):
+        """Пройти ленту курсорами до конца, вернуть id и последнюю страницу"""
+        seen = []
+        while True:
+            response = self.client.get(url, {'cursor': cursor})
+            page_obj = response.context['page_obj']
+            seen.extend(post.id for post in page_obj)
+            if not page_obj.has_next():
+                return seen, page_obj
+            cursor = page_obj.next_cursor
+
+    def test_cursor_walk_covers_feed_in_order(self):
+        """Курсоры обходят ленту целиком и без повторов."""
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('id', flat=True))
+        for url in self.urls:
+            with self.subTest(url=url):
+                seen, last_page = self.walk(url)
+                self.assertEqual(seen, expected)
+                self.assertTrue(last_page.has_previous())
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Курсор назад возвращает ту же страницу, что и прямой обход."""
+        url = reverse('posts:index')
+        first = self.client.get(url, {'cursor': ''}).context['page_obj']
+        second = self.client.get(
+            url, {'cursor': first.next_cursor}).context['page_obj']
+        back = self.client.get(
+            url, {'cursor': second.previous_cursor}).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_deep_page_costs_one_query(self):
+        """Глубокая страница — один запрос без COUNT и OFFSET."""
+        url = reverse('posts:index')
+        _, last_page = self.walk(url)
+        cursor = last_page.previous_cursor
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'cursor': cursor})
+        self.assertEqual(len(response.context['page_obj']),
+                         settings.POSTS_CHIK)
+
+    def test_broken_cursor_shows_first_page(self):
+        """Битый токен открывает первую страницу."""
+        response = self.client.get(reverse('posts:index'),
+                                   {'cursor': 'not-a-cursor'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj[0], Post.objects.order_by(
+            '-pub_date', '-id').first())
+        self.assertFalse(page_obj.has_previous())
+
+
+class PaginatorTemplateTest(TestCase):
+    def render_nav(self, num_pages, number):
+        paginator = Paginator(range(num_pages * settings.POSTS_CHIK),
+                              settings.POSTS_CHIK)
+        return render_to_string('posts/includes/paginator.html',
+                                {'page_obj': paginator.page(number)})
+
+    def test_nav_size_does_not_depend_on_num_pages(self):
+        """Число ссылок навигации постоянно при любом числе страниц."""
+        window = settings.PAGINATOR_ON_EACH_SIDE
+        # «Первая», «Предыдущая», окно, две крайние, два пропуска,
+        # «Следующая», «Последняя».
+        expected = 2 + (2 * window + 1) + 2 + 2 + 2
+        for num_pages in (100, 1000, 50000):
+            with self.subTest(num_pages=num_pages):
+                html = self.render_nav(num_pages, num_pages // 2)
+                self.assertEqual(html.count('page-item'), expected)
+
+    def test_nav_keeps_first_current_and_last_pages(self):
+        """В навигации есть первая, текущая и последняя страницы."""
+        html = self.render_nav(50000, 777)
+        for number in (1, 776, 777, 778, 50000):
+            with self.subTest(number=number):
+                self.assertIn(f'>{number}<', html)
+        self.assertNotIn('>500<', html)
+
+
+class CountStrategyViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Counter')
+        for _ in range(settings.POSTS_CHIK + 3):
+            Post.objects.create(text=fake.text(), author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data)
+        counts = [q for q in queries.captured_queries
+                  if 'COUNT(' in q['sql']]
+        return response.context['page_obj'], counts
+
+    @override_settings(
+        PAGINATOR_COUNT_STRATEGIES={'posts:index': 'has_more'})
+    def test_has_more_skips_count(self):
+        """Стратегия has_more не делает COUNT(*)."""
+        url = reverse('posts:index')
+        first, counts = self.get_page(url)
+        self.assertEqual(counts, [])
+        self.assertTrue(first.has_next())
+        second, counts = self.get_page(url, {'page': 2})
+        self.assertEqual(counts, [])
+        self.assertFalse(second.has_next())
+        self.assertEqual(len(second), 3)
+        last, _ = self.get_page(url, {'page': 100})
+        self.assertEqual(last.number, 1)
+
+    @override_settings(PAGINATOR_COUNT_STRATEGIES={'posts:index': 'cached'})
+    def test_cached_count_invalidated_on_write(self):
+        """Закэшированный COUNT(*) сбрасывается после записи поста."""
+        url = reverse('posts:index')
+        _, counts = self.get_page(url)
+        self.assertEqual(len(counts), 1)
+        page_obj, counts = self.get_page(url, {'page': 2})
+        self.assertEqual(counts, [])
+        self.assertEqual(page_obj.paginator.count, settings.POSTS_CHIK + 3)
+        Post.objects.create(text=fake.text(), author=self.user)
+        page_obj, counts = self.get_page(url)
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(page_obj.paginator.count, settings.POSTS_CHIK + 4)
+
+    @override_settings(
+        PAGINATOR_COUNT_STRATEGIES={'posts:profile': 'denormalized'})
+    def test_denormalized_count_reads_counter(self):
+        """Профиль берёт число постов из счётчика автора."""
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        page_obj, counts = self.get_page(url, {'page': 2})
+        self.assertEqual(counts, [])
+        self.assertEqual(page_obj.paginator.count, settings.POSTS_CHIK + 3)
+        self.assertEqual(len(page_obj), 3)
+
+
+class QueryBudgetViewsTest(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Budget')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'budget-{i}',
+                                 description='')
+            for i in range(3)
+        ]
+        cls.posts = [
+            Post.objects.create(text=fake.text(), author=cls.user,
+                                group=group)
+            for group in cls.groups * 4
+        ]
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_views_stay_within_budget(self):
+        """Ленты и пост укладываются в бюджет запросов без N+1."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list',
+                    kwargs={'slug': self.groups[0].slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.posts[0].id}),
+            reverse('posts:search') + '?q=a',
+        )
+        for client in (self.client, self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url, client=client):
+                    # Первый запрос прогревает кэш отметок лент.
+                    client.get(url)
+                    self.assertQueryBudget(client.get(url))
+
+    def test_repeated_queries_are_reported(self):
+        """Запросы одной формы с разными параметрами считаются N+1."""
+        with record_queries() as report:
+            for post in Post.objects.all()[:3]:
+                post.group.title
+        self.assertEqual(list(report.repeated(1).values()), [3])
+
+    @override_settings(SQL_BUDGET_ACTION='raise',
+                       SQL_BUDGETS={'posts:index': {'queries': 1}})
+    def test_exceeded_budget_raises(self):
+        """При SQL_BUDGET_ACTION='raise' превышение бюджета — ошибка."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('posts:index'))
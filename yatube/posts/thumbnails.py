@@ -0,0 +1,106 @@
+import logging
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from tasks.queue import enqueue
+
+from .feeds import post_feeds, touch_feeds
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+GENERATE_TASK = 'posts.generate_thumbnails'
+
+
+def thumbnail_file(image, alias):
+    """Миниатюра картинки под именем, которое даст ей sorl.
+
+    Опции дополняются так же, как в ThumbnailBackend.get_thumbnail,
+    но сама картинка не читается и ничего не создаётся.
+    """
+    geometry, options = settings.POST_THUMBNAILS[alias]
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(source, geometry, options)
+    return ImageFile(name, default.storage)
+
+
+def thumbnail_ratio(alias='card'):
+    """Соотношение сторон миниатюры для CSS, например «960 / 339».
+
+    Берётся из геометрии POST_THUMBNAILS; если задана только одна
+    сторона, соотношение зависит от картинки, и вернётся None.
+    """
+    geometry, _ = settings.POST_THUMBNAILS[alias]
+    width, _, height = geometry.partition('x')
+    if not (width.isdigit() and height.isdigit()):
+        return None
+    return f'{width} / {height}'
+
+
+def ready_thumbnails(posts, alias='card'):
+    """{post.pk: миниатюра} для постов, чьи миниатюры уже готовы."""
+    wanted = {post.pk: thumbnail_file(post.image, alias)
+              for post in posts if post.image}
+    if not wanted:
+        return {}
+    found = default.kvstore.get_many(wanted.values())
+    return {pk: found[thumbnail.key] for pk, thumbnail in wanted.items()
+            if thumbnail.key in found}
+
+
+def generate_thumbnails(post_id):
+    """Создать недостающие миниатюры поста; True, если что-то создано.
+
+    После создания версия поста сдвигается, чтобы карточка и страницы
+    лент перерисовались с картинкой вместо заглушки.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return False
+    created = False
+    for alias, (geometry, options) in settings.POST_THUMBNAILS.items():
+        if default.kvstore.get(thumbnail_file(post.image, alias)) is None:
+            get_thumbnail(post.image, geometry, **options)
+            created = True
+    if created:
+        Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
+        touch_feeds(post_feeds(post))
+    return created
+
+
+def run(post_id):
+    """generate_thumbnails для потока пула команды: ошибки только в лог."""
+    try:
+        return generate_thumbnails(post_id)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры поста %s', post_id)
+        return False
+    finally:
+        # У каждого потока свои соединения с БД.
+        connections.close_all()
+
+
+def schedule(post):
+    """Поставить подготовку миниатюр в очередь фоновых задач.
+
+    Ключ включает имя файла: правка текста не ставит задачу повторно,
+    а новая картинка — ставит.
+    """
+    return enqueue(GENERATE_TASK, key=f'thumbnails:{post.pk}:{post.image}',
+                   post_id=post.pk)
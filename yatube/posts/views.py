@@ -1,11 +1,17 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 
+from .export import export_response
+from .feeds import (feed_page, group_feed, index_feed, post_detail_feeds,
+                    profile_feed)
 from .forms import PostForm
-from .models import Post, Group, User
+from .models import Post, Group, User, author_posts_count
+from .search import search_posts
+from .thumbnails import ready_thumbnails
 from core.utils import get_paginator_obj
 
 
+@feed_page(lambda request: [index_feed()])
 def index(request):
     post_list = Post.objects.select_related('author', 'group')
     page_obj = get_paginator_obj(request, post_list, 10)
@@ -15,10 +21,12 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@feed_page(lambda request, slug: [group_feed(slug)])
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.select_related('author')
-    page_obj = get_paginator_obj(request, posts, 10)
+    page_obj = get_paginator_obj(request, posts, 10,
+                                 known_count=group.posts_count)
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -26,32 +34,72 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@feed_page(lambda request, username: [profile_feed(username)])
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    user_posts = author.posts.all()
-    page_obj = get_paginator_obj(request, user_posts, 10)
+    author = get_object_or_404(User.objects.select_related('post_counter'),
+                               username=username)
+    user_posts = author.posts.select_related('group')
+    posts_count = author_posts_count(author)
+    page_obj = get_paginator_obj(request, user_posts, 10,
+                                 known_count=posts_count)
     context = {
         'author': author,
+        'posts_count': posts_count,
         'page_obj': page_obj,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.user != author and not request.user.is_staff:
+        return redirect('posts:profile', username)
+    return export_response(author.posts.all(), request.GET.get('format'),
+                           f'profile-{author.username}')
+
+
+@login_required
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    if not request.user.is_staff:
+        return redirect('posts:group_list', slug)
+    return export_response(group.posts.all(), request.GET.get('format'),
+                           f'group-{group.slug}')
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(Post.objects.select_related('author', 'group'),
+                         query)
+    page_obj = get_paginator_obj(request, posts, 10, mode='page')
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@feed_page(post_detail_feeds)
 def post_detail(request, post_id):
-    user_post = get_object_or_404(Post, id=post_id)
+    user_post = get_object_or_404(
+        Post.objects.select_related('author__post_counter', 'group'),
+        id=post_id)
     context = {
         'user_post': user_post,
+        'posts_count': author_posts_count(user_post.author),
+        'thumbnail': ready_thumbnails([user_post]).get(user_post.pk),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         create_post = form.save(commit=False)
         create_post.author = request.user
-        form.save()
+        form.save_retrying()
 
         return redirect('posts:profile', create_post.author)
 
@@ -66,12 +114,13 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     select_post = get_object_or_404(Post, id=post_id)
-    if request.user != select_post.author:
+    if request.user.pk != select_post.author_id:
         return redirect('posts:post_detail', post_id=post_id)
 
-    form = PostForm(request.POST or None, instance=select_post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=select_post)
     if form.is_valid():
-        form.save()
+        form.save_retrying()
         return redirect('posts:post_detail', post_id)
 
     context = {
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    name = 'tasks'
+
+    def ready(self):
+        # Задачи объявляются в модулях tasks.py приложений; реестр должен
+        # быть полон и в веб-процессе, и в воркере.
+        from . import mail  # noqa: F401
+        autodiscover_modules('tasks')
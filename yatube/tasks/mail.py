@@ -0,0 +1,23 @@
+from django.core.mail import EmailMultiAlternatives
+
+from .queue import task
+
+
+@task(name='tasks.send_mail')
+def send_mail(subject, body, from_email, to, html=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html:
+        message.attach_alternative(html, 'text/html')
+    message.send()
+
+
+def enqueue_mail(subject, body, to, from_email=None, html=None, key=None):
+    """Отправить письмо через очередь.
+
+    Письмо уже отрендерено: воркеру остаётся только отправка. Без key
+    каждый вызов ставит новое письмо: одинаковые письма законны, например
+    повторный сброс пароля. Ключ задачи хранится и после отправки,
+    поэтому key нужен только письмам, которые уходят один раз.
+    """
+    return send_mail.enqueue(key=key, subject=subject, body=body,
+                             from_email=from_email, to=list(to), html=html)
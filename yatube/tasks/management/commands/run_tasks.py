@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+import django
+from django.core.management.base import BaseCommand
+
+from tasks.queue import claim, run_pending, work
+
+
+class Command(BaseCommand):
+    help = ('Выполнять фоновые задачи из очереди пулом потоков или '
+            'процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Размер пула; 0 — в этом потоке.')
+        parser.add_argument('--mode', choices=('thread', 'process'),
+                            default='thread')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить готовые задачи и выйти.')
+
+    def handle(self, *args, **options):
+        self.worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.once = options['once']
+        self.poll = options['poll']
+        workers = options['workers']
+        try:
+            if not workers:
+                done = self.run_inline()
+            else:
+                done = self.run_pool(workers, options['mode'])
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
+
+    def run_inline(self):
+        done = 0
+        while True:
+            count = run_pending(self.worker)
+            done += count
+            if not count:
+                if self.once:
+                    return done
+                time.sleep(self.poll)
+
+    def run_pool(self, workers, mode):
+        if mode == 'process':
+            # spawn, а не fork: дочерние процессы не унаследуют открытые
+            # соединения с БД и сами настроят Django.
+            pool = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup)
+        else:
+            pool = ThreadPoolExecutor(workers, thread_name_prefix='tasks')
+        running = set()
+        done = 0
+        with pool:
+            while True:
+                # Берём задач не больше, чем свободных мест в пуле: иначе
+                # захваченные ждали бы, пока их мог выполнить другой воркер.
+                free = workers - len(running)
+                pks = claim(self.worker, limit=free) if free else []
+                running.update(pool.submit(work, pk) for pk in pks)
+                if not running:
+                    if self.once:
+                        return done
+                    time.sleep(self.poll)
+                    continue
+                finished, running = wait(running, timeout=self.poll,
+                                         return_when=FIRST_COMPLETED)
+                done += len(finished)
@@ -0,0 +1,72 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Фоновая задача: имя из реестра и аргументы в JSON."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не удалась'),
+    )
+
+    name = models.CharField(
+        max_length=200,
+    )
+    payload = models.TextField(
+        default='{}',
+    )
+    # Повторная постановка с тем же ключом возвращает уже созданную
+    # задачу, поэтому двойной клик не отправит два письма.
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=5,
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+    )
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+    last_error = models.TextField(
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='task_status_run_at_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}: {self.status}'
@@ -0,0 +1,160 @@
+import json
+import logging
+import random
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(name=None, max_attempts=None):
+    """Зарегистрировать функцию как фоновую задачу.
+
+    У функции появляется enqueue(key=None, delay=0, **kwargs); аргументы
+    задачи передаются только по имени и должны сериализоваться в JSON.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        REGISTRY[task_name] = func
+        func.task_name = task_name
+        func.enqueue = partial(enqueue, task_name,
+                               max_attempts=max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, key=None, delay=0, max_attempts=None, **kwargs):
+    """Поставить задачу в очередь и вернуть её.
+
+    Строка пишется в текущей транзакции: если запрос откатится, задачи
+    не будет. С ключом key повторная постановка вернёт прежнюю задачу.
+    При TASKS_EAGER задача выполняется сразу после коммита.
+    """
+    if name not in REGISTRY:
+        raise UnknownTask(name)
+    fields = {
+        'name': name,
+        'payload': json.dumps(kwargs, cls=DjangoJSONEncoder),
+        'run_at': timezone.now() + timedelta(seconds=delay),
+        'max_attempts': max_attempts or settings.TASKS_MAX_ATTEMPTS,
+    }
+    if key is None:
+        queued, created = Task.objects.create(**fields), True
+    else:
+        try:
+            with transaction.atomic():
+                queued, created = Task.objects.get_or_create(
+                    key=key, defaults=fields)
+        except IntegrityError:
+            queued, created = Task.objects.get(key=key), False
+    if created and settings.TASKS_EAGER:
+        transaction.on_commit(partial(run_now, queued.pk))
+    return queued
+
+
+def claimable():
+    """Задачи, которые можно взять: пора выполнять или воркер пропал."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    return (Q(status=Task.QUEUED, run_at__lte=now)
+            | Q(status=Task.RUNNING, locked_at__lt=stale))
+
+
+def claim_task(pk, worker):
+    """Захватить задачу условным UPDATE; True, если она досталась нам.
+
+    Условие повторяется в UPDATE, поэтому из нескольких воркеров задачу
+    получит ровно один — без SELECT ... FOR UPDATE, которого нет в
+    SQLite.
+    """
+    return bool(Task.objects.filter(claimable(), pk=pk).update(
+        status=Task.RUNNING, locked_by=worker, locked_at=timezone.now(),
+        attempts=F('attempts') + 1))
+
+
+def claim(worker, limit=1):
+    """Захватить до limit готовых задач; их id в порядке очереди."""
+    candidates = (Task.objects.filter(claimable()).order_by('run_at', 'pk')
+                  .values_list('pk', flat=True)[:limit])
+    return [pk for pk in candidates if claim_task(pk, worker)]
+
+
+def retry_delay(attempts):
+    """Экспоненциальная пауза перед повтором со случайным разбросом."""
+    delay = min(settings.TASKS_BACKOFF * 2 ** (attempts - 1),
+                settings.TASKS_BACKOFF_MAX)
+    return random.uniform(delay / 2, delay)
+
+
+def run_task(pk):
+    """Выполнить захваченную задачу; True при успехе.
+
+    Ошибка не выходит наружу: задача возвращается в очередь с паузой
+    или, если попытки кончились, помечается неудавшейся.
+    """
+    current = Task.objects.get(pk=pk)
+    try:
+        func = REGISTRY.get(current.name)
+        if func is None:
+            raise UnknownTask(current.name)
+        func(**json.loads(current.payload))
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if current.attempts >= current.max_attempts:
+            logger.error('Задача %s не удалась: %s', current, error)
+            changes = {'status': Task.FAILED, 'finished_at': now}
+        else:
+            logger.warning('Задача %s упала, повтор: %s', current, error)
+            delay = retry_delay(current.attempts)
+            changes = {'status': Task.QUEUED,
+                       'run_at': now + timedelta(seconds=delay)}
+        Task.objects.filter(pk=pk).update(
+            locked_by='', locked_at=None, last_error=error, **changes)
+        return False
+    Task.objects.filter(pk=pk).update(
+        status=Task.DONE, finished_at=timezone.now(), locked_by='',
+        locked_at=None)
+    return True
+
+
+def run_now(pk, worker='eager'):
+    if claim_task(pk, worker):
+        return run_task(pk)
+    return False
+
+
+def work(pk):
+    """run_task для потока или процесса пула: у каждого свои соединения."""
+    try:
+        return run_task(pk)
+    finally:
+        connections.close_all()
+
+
+def run_pending(worker='inline', limit=100):
+    """Выполнить готовые задачи в этом потоке; сколько выполнено."""
+    done = 0
+    while done < limit:
+        pks = claim(worker, limit=min(10, limit - done))
+        if not pks:
+            break
+        for pk in pks:
+            run_task(pk)
+        done += len(pks)
+    return done
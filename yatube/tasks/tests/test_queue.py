@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim, enqueue, run_pending, task
+
+CALLS = []
+
+
+@task(name='tests.record')
+def record(value):
+    CALLS.append(value)
+
+
+@task(name='tests.flaky', max_attempts=3)
+def flaky(fail_times):
+    CALLS.append('try')
+    if CALLS.count('try') <= fail_times:
+        raise RuntimeError('temporary')
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        record.enqueue(value=1)
+        record.enqueue(value=2)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(CALLS, [1, 2])
+        self.assertEqual(
+            set(Task.objects.values_list('status', 'attempts')),
+            {(Task.DONE, 1)})
+
+    def test_idempotency_key(self):
+        """Повтор с тем же ключом не создаёт вторую задачу."""
+        first = record.enqueue(key='once', value=1)
+        second = record.enqueue(key='once', value=2)
+        self.assertEqual(first.pk, second.pk)
+        run_pending()
+        record.enqueue(key='once', value=3)
+        run_pending()
+        self.assertEqual(CALLS, [1])
+
+    def test_delay(self):
+        record.enqueue(delay=60, value=1)
+        self.assertEqual(run_pending(), 0)
+
+    @override_settings(TASKS_BACKOFF=10, TASKS_BACKOFF_MAX=15)
+    def test_retry_with_backoff(self):
+        """Упавшая задача откладывается с растущей паузой."""
+        queued = flaky.enqueue(fail_times=5)
+        delays = []
+        for attempt in range(1, 4):
+            before = timezone.now()
+            run_pending()
+            queued.refresh_from_db()
+            self.assertEqual(queued.attempts, attempt)
+            self.assertIn('RuntimeError', queued.last_error)
+            delays.append((queued.run_at - before).total_seconds())
+            Task.objects.filter(pk=queued.pk).update(run_at=before)
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertTrue(5 <= delays[0] <= 10.5)
+        self.assertTrue(7.5 <= delays[1] <= 15.5)
+        self.assertEqual(CALLS.count('try'), 3)
+
+    def test_recovers_after_retry(self):
+        queued = flaky.enqueue(fail_times=1)
+        run_pending()
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.DONE, 2))
+
+    def test_claim_is_exclusive_and_reclaims_stale(self):
+        queued = record.enqueue(value=1)
+        self.assertEqual(claim('first'), [queued.pk])
+        self.assertEqual(claim('second'), [])
+        Task.objects.filter(pk=queued.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(claim('second'), [queued.pk])
+
+    def test_unknown_task_fails(self):
+        queued = record.enqueue(value=1)
+        Task.objects.filter(pk=queued.pk).update(name='tests.missing',
+                                                 max_attempts=1)
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertIn('UnknownTask', queued.last_error)
+
+    def test_run_tasks_command(self):
+        for value in range(3):
+            record.enqueue(value=value)
+        out = StringIO()
+        call_command('run_tasks', workers=0, once=True, stdout=out)
+        self.assertIn('Выполнено задач: 3', out.getvalue())
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+
+
+@override_settings(TASKS_EAGER=True)
+class EagerTaskTest(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_eager_runs_after_commit(self):
+        queued = enqueue('tests.record', value=7)
+        self.assertEqual(CALLS, [7])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.DONE)
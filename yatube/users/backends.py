@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    """Убрать пользователя из кэша: он изменился или вышел."""
+    caches[settings.USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт request.user из кэша, а не из БД.
+
+    Пользователь кэшируется на USER_CACHE_TIMEOUT секунд и удаляется из
+    кэша при сохранении (смена пароля, правка в админке, вход), при
+    изменении групп и прав и при выходе. Хэш пароля лежит в кэше вместе
+    с пользователем, так что сессии после смены пароля отклоняются как
+    обычно.
+    """
+
+    def get_user(self, user_id):
+        cache = caches[settings.USER_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
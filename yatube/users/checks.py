@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+CACHED_BACKEND = 'users.backends.CachedModelBackend'
+
+
+@register(Tags.caches, Tags.security)
+def check_user_cache(app_configs, **kwargs):
+    """Кэш пользователей должен быть общим для всех процессов.
+
+    Сброс после смены пароля, блокировки или прав видит только кэш того
+    процесса, который обработал правку; в LocMemCache остальные процессы
+    отдавали бы прежнего пользователя до USER_CACHE_TIMEOUT.
+    """
+    if CACHED_BACKEND not in settings.AUTHENTICATION_BACKENDS:
+        return []
+    cache = caches[settings.USER_CACHE_ALIAS]
+    if settings.WEB_PROCESSES > 1 and isinstance(cache, LocMemCache):
+        return [Error(
+            f'Кэш {settings.USER_CACHE_ALIAS!r} у каждого процесса свой, '
+            f'а процессов {settings.WEB_PROCESSES}.',
+            hint='Укажите в USER_CACHE_ALIAS общий кэш (Memcached, Redis, '
+                 'файловый) или уберите CachedModelBackend из '
+                 'AUTHENTICATION_BACKENDS.',
+            id='users.E001',
+        )]
+    return []
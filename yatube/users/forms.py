@@ -1,6 +1,8 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth import get_user_model
 
+from .tasks import send_password_reset
+
 User = get_user_model()
 
 
@@ -8,3 +10,28 @@ class CreationForm(UserCreationForm):
     class Meta:
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо сброса пароля собирает и отправляет воркер очереди.
+
+    Ссылка со сбросом даёт вход в учётную запись, поэтому в задачу
+    попадают только id пользователя, адрес и имена шаблонов.
+    """
+
+    # Эти ключи контекста воркер заполняет сам.
+    WORKER_CONTEXT = ('user', 'uid', 'token', 'email')
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        send_password_reset.enqueue(
+            user_id=context['user'].pk,
+            email=to_email,
+            subject_template_name=subject_template_name,
+            email_template_name=email_template_name,
+            html_email_template_name=html_email_template_name,
+            from_email=from_email,
+            extra_context={key: value for key, value in context.items()
+                           if key not in self.WORKER_CONTEXT},
+        )
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import forget_user
+
+User = get_user_model()
+
+
+def forget_on_commit(user_id):
+    # Сбросить сразу и ещё раз после коммита: до коммита другой запрос
+    # успел бы снова положить в кэш прежнюю версию пользователя.
+    forget_user(user_id)
+    transaction.on_commit(lambda: forget_user(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_changed_user(sender, instance, **kwargs):
+    forget_on_commit(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def forget_user_with_new_rights(sender, instance, action, reverse,
+                                pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        forget_on_commit(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            forget_on_commit(user_id)
+    # Группа, очищенная целиком, не сообщает, кого затронула:
+    # такие пользователи обновятся по USER_CACHE_TIMEOUT.
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.template import loader
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from tasks.mail import send_mail
+from tasks.queue import task
+
+User = get_user_model()
+
+
+@task(name='users.send_password_reset')
+def send_password_reset(user_id, email, subject_template_name,
+                        email_template_name, html_email_template_name=None,
+                        from_email=None, extra_context=None):
+    """Собрать и отправить письмо сброса пароля.
+
+    Токен и ссылка появляются только здесь и нигде не хранятся: в очереди
+    лежат id пользователя и имена шаблонов.
+    """
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None or not user.has_usable_password():
+        return
+    context = {
+        **extra_context,
+        'email': email,
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'user': user,
+        'token': default_token_generator.make_token(user),
+    }
+    subject = ''.join(loader.render_to_string(
+        subject_template_name, context).splitlines())
+    body = loader.render_to_string(email_template_name, context)
+    html = None
+    if html_email_template_name is not None:
+        html = loader.render_to_string(html_email_template_name, context)
+    send_mail(subject, body, from_email, [email], html=html)
@@ -0,0 +1,93 @@
+from django.contrib.auth import BACKEND_SESSION_KEY, get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.core.checks import run_checks
+from django.db import connection
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.backends import user_cache_key
+
+User = get_user_model()
+
+STOCK_AUTH = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+class CachedAuthTest(TransactionTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(username='tolstoy',
+                                             password='Anna-1877')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('posts:post_create')
+
+    def queries(self, client):
+        """Запросы к БД на повторную загрузку страницы."""
+        client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def cached_user(self):
+        return caches['default'].get(user_cache_key(self.user.pk))
+
+    def test_session_and_user_come_from_cache(self):
+        """Сессия и пользователь не читаются из БД: на два запроса меньше."""
+        cached = self.queries(self.client)
+        with override_settings(**STOCK_AUTH):
+            client = Client()
+            client.force_login(self.user)
+            stock = self.queries(client)
+        self.assertEqual(cached, stock - 2)
+
+    def test_password_change_drops_other_sessions(self):
+        other = Client()
+        other.force_login(self.user)
+        self.client.get(self.url)
+        self.assertIsNotNone(self.cached_user())
+        response = self.client.post(reverse('users:password_change'), {
+            'old_password': 'Anna-1877',
+            'new_password1': 'Karenina-1878',
+            'new_password2': 'Karenina-1878',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(other.get(self.url).status_code, 302)
+
+    def test_admin_edit_is_seen_at_once(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.cached_user())
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_logout_and_rights_change_forget_user(self):
+        self.client.get(self.url)
+        self.user.groups.add(Group.objects.create(name='editors'))
+        self.assertIsNone(self.cached_user())
+        self.client.get(self.url)
+        self.assertIsNotNone(self.cached_user())
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(self.cached_user())
+
+    def test_sessions_of_stock_backend_stay_logged_in(self):
+        """Сессии, открытые с ModelBackend до кэша, не теряются."""
+        client = Client()
+        client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(client.session[BACKEND_SESSION_KEY],
+                         'django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(client.get(self.url).status_code, 200)
+
+    def test_local_cache_with_many_processes_fails_check(self):
+        """С LocMemCache и несколькими процессами проект не запустится."""
+        with override_settings(WEB_PROCESSES=2):
+            self.assertIn('users.E001',
+                          [error.id for error in run_checks()])
+        self.assertNotIn('users.E001', [error.id for error in run_checks()])
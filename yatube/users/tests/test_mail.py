@@ -0,0 +1,61 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from tasks.models import Task
+from tasks.queue import run_pending
+
+User = get_user_model()
+
+
+class QueuedMailTest(TestCase):
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_password_reset_mail_goes_through_queue(self):
+        """Письмо сброса пароля не отправляется в запросе."""
+        user = User.objects.create_user(username='forgetful', password='x',
+                                        email='forgetful@mail.ru')
+        for _ in range(2):
+            response = self.guest_client.post(
+                reverse('users:password_reset'),
+                {'email': 'forgetful@mail.ru'})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        # Повторный сброс — новое письмо, даже если текст тот же.
+        self.assertEqual(Task.objects.count(), 2)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 2)
+        for message in mail.outbox:
+            self.assertEqual(message.to, ['forgetful@mail.ru'])
+            self.assertIn('/auth/reset/', message.body)
+        # Ссылка со сбросом собирается воркером и в очереди не хранится.
+        links = [line.strip() for message in mail.outbox
+                 for line in message.body.splitlines()
+                 if '/auth/reset/' in line]
+        self.assertEqual(len(links), 2)
+        for queued in Task.objects.all():
+            payload = json.loads(queued.payload)
+            self.assertEqual(payload['user_id'], user.pk)
+            self.assertNotIn('token', payload['extra_context'])
+            for link in links:
+                self.assertNotIn(link, queued.payload)
+
+    def test_signup_enqueues_welcome_mail(self):
+        response = self.guest_client.post(reverse('users:signup'), {
+            'first_name': 'Анна',
+            'last_name': 'Каренина',
+            'username': 'anna',
+            'email': 'anna@mail.ru',
+            'password1': 'Vronsky-1877',
+            'password2': 'Vronsky-1877',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Анна Каренина', mail.outbox[0].body)
+        self.assertIn('/profile/anna/', mail.outbox[0].body)
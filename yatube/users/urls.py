@@ -6,9 +6,10 @@ from django.contrib.auth.views import (LoginView,
                                        PasswordResetDoneView,
                                        PasswordResetCompleteView,
                                        PasswordResetConfirmView)
-from django.urls import path
+from django.urls import path, reverse_lazy
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -40,7 +41,8 @@ urlpatterns = [
         'password_reset/',
         PasswordResetView.as_view(
             template_name='users/password_reset_form.html',
-            success_url='users:password_reset_success',
+            form_class=QueuedPasswordResetForm,
+            success_url=reverse_lazy('users:password_reset_success'),
         ),
         name='password_reset',
     ),
@@ -54,7 +56,7 @@ urlpatterns = [
         'reset/<uidb64>/<token>/',
         PasswordResetConfirmView.as_view(
             template_name='users/password_reset_confirm.html',
-            success_url='users:password_reset_complete'),
+            success_url=reverse_lazy('users:password_reset_complete')),
         name='password_reset_confirm'),
     path(
         'reset/done/',
@@ -1,6 +1,9 @@
+from django.template import loader
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
+from tasks.mail import enqueue_mail
+
 from .forms import CreationForm
 
 
@@ -8,3 +11,15 @@ class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        user = self.object
+        if user.email:
+            context = {'user': user, 'request': self.request}
+            enqueue_mail(
+                loader.render_to_string('users/signup_subject.txt',
+                                        context).strip(),
+                loader.render_to_string('users/signup_email.txt', context),
+                [user.email], key=f'signup:{user.pk}')
+        return response
@@ -46,9 +46,15 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'sorl.thumbnail',
+    'tasks.apps.TasksConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +62,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.ViewTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -73,6 +81,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
             ],
+            'builtins': ['core.templatetags.cached_url'],
         },
     },
 ]
@@ -87,9 +96,86 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами одного потока.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Применяются к каждому новому соединению SQLite (core.sqlite).
+# WAL не даёт читателям блокировать писателя; busy_timeout ждёт
+# освобождения базы вместо мгновенного «database is locked»;
+# NORMAL в режиме WAL не теряет согласованности при сбое процесса.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ.
+    'cache_size': -20000,
+}
+# Попытки транзакции записи при блокировке и первая пауза в секундах.
+SQLITE_WRITE_RETRIES = 5
+SQLITE_RETRY_BACKOFF = 0.05
+
+# Реплики только для чтения — алиасы из DATABASES; пустой список
+# отправляет всё в default. Для проверки на своей машине
+# YATUBE_SQLITE_REPLICA=1 добавляет второй файл SQLite, который
+# заполняет manage.py replicate_sqlite с задержкой репликации.
+DATABASE_REPLICAS = []
+if os.environ.get('YATUBE_SQLITE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает с основной базы; должно
+# быть больше обычной задержки реплик.
+REPLICA_PIN_SECONDS = 10
+REPLICA_PIN_COOKIE = 'pin_primary'
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# 'fragments' хранит HTML карточек постов. Для общего кэша между
+# процессами подойдёт файловый бэкенд:
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#   'LOCATION': os.path.join(BASE_DIR, 'cache', 'fragments'),
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragments',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+FRAGMENT_CACHE_ALIAS = 'fragments'
+
+# Сессии читаются из кэша, а пишутся и в кэш, и в БД: после сброса кэша
+# пользователи остаются в системе.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# request.user тоже берётся из кэша. При нескольких процессах нужен
+# общий кэш: иначе правка пользователя сбросит кэш только своего процесса.
+# Проверка users.E001 не даст запуститься с LocMemCache, если процессов
+# больше одного; их число берётся из WEB_CONCURRENCY, как у gunicorn.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    # В сессиях, открытых до кэша, записан путь ModelBackend; без него
+    # в списке Django не найдёт бэкенд и разлогинит пользователя.
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TIMEOUT = 60 * 5
+WEB_PROCESSES = int(os.environ.get('WEB_CONCURRENCY', 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -130,6 +216,9 @@ USE_TZ = True
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_URL = '/static/'
 
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_URL = '/media/'
+
 POSTS_SHOWN = 10
 
 LOGIN_URL = 'users:login'
@@ -140,3 +229,118 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 COUNT_WORD = 15
 
 POSTS_CHIK = 10
+
+# 'page' — нумерованные страницы, 'cursor' — keyset-пагинация по
+# (pub_date, id), стоимость страницы не зависит от её глубины.
+PAGINATION_MODE = 'page'
+
+# Сколько номеров страниц показывать по обе стороны от текущей.
+PAGINATOR_ON_EACH_SIDE = 2
+
+# Способ подсчёта постов для нумерованных страниц по имени URL с
+# пространством имён, как в SQL_BUDGETS: 'exact', 'cached',
+# 'denormalized' или 'has_more'.
+PAGINATOR_COUNT_STRATEGIES = {
+    'posts:index': 'exact',
+    'posts:group_list': 'exact',
+    'posts:profile': 'exact',
+}
+
+# Время жизни закэшированного COUNT(*) в секундах.
+PAGINATOR_COUNT_TIMEOUT = 60
+
+# Больше скольких строк админка не считает отфильтрованный список постов.
+ADMIN_COUNT_LIMIT = 10000
+
+# Бюджет SQL-запросов на представление (по имени URL): число запросов
+# 'queries', время в БД 'time_ms' и сколько раз допустим запрос одной
+# формы 'repeats' — больше считается N+1.
+SQL_BUDGET_ENABLED = DEBUG
+SQL_BUDGET_ACTION = 'log'
+SQL_BUDGET_DEFAULTS = {'repeats': 1}
+SQL_BUDGETS = {
+    'posts:index': {'queries': 4},
+    'posts:group_list': {'queries': 5},
+    'posts:profile': {'queries': 5},
+    'posts:post_detail': {'queries': 4},
+    'posts:search': {'queries': 4},
+    'api:posts': {'queries': 2},
+    'api:group_posts': {'queries': 3},
+    'api:profile': {'queries': 3},
+    'api:post_detail': {'queries': 3},
+    # Перенос поста между группами обновляет два счётчика одним запросом.
+    'posts:post_edit': {'repeats': 2},
+}
+
+# Заголовок Server-Timing и строка JSON в лог core.timing с временем
+# фаз каждого запроса (core.middleware.ServerTimingMiddleware).
+# Выключенные замеры ничего не устанавливают и ничего не стоят;
+# включает их переменная окружения YATUBE_SERVER_TIMING=1.
+SERVER_TIMING_ENABLED = bool(os.environ.get('YATUBE_SERVER_TIMING'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'timing': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['timing'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Профилирование запросов (core.middleware.ProfilingMiddleware).
+# Сотрудник включает его для своего запроса параметром ?_profile=1
+# или заголовком X-Profile: 1; значение memory добавляет tracemalloc.
+# Доля PROFILING_SAMPLE_RATE запросов любых пользователей профилируется
+# сама. Сводку по представлению строит manage.py profile_report.
+PROFILING_ENABLED = True
+PROFILING_PARAM = '_profile'
+PROFILING_HEADER = 'HTTP_X_PROFILE'
+PROFILING_RESPONSE_HEADER = 'X-Profile-File'
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILING_SUMMARY_LINES = 40
+PROFILING_TRACEMALLOC_FRAMES = 1
+
+# Кэш готовых страниц лент для гостей. Версия страницы меняется при
+# записи постов, поэтому время жизни ограничивает лишь устаревание
+# имён авторов и прочих данных вне лент.
+PAGE_CACHE_ENABLED = not DEBUG
+# Сколько секунд отметка изменения ленты живёт в кэше процесса. Столько
+# же процесс может не замечать записи, сделанные другими процессами.
+FEED_MARKER_TIMEOUT = 5
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Сколько постов читать из БД за раз при потоковой выгрузке.
+EXPORT_CHUNK_SIZE = 2000
+
+# Миниатюры картинок постов: имя -> (геометрия, опции sorl-thumbnail).
+# Их заранее готовит фоновая задача после сохранения поста, а до тех
+# пор шаблоны показывают заглушку.
+POST_THUMBNAILS = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+# Хранилище sorl с пакетным чтением: лента узнаёт о готовности всех
+# миниатюр страницы одним обращением к кэшу.
+THUMBNAIL_KVSTORE = 'posts.kvstore.KVStore'
+
+# Очередь фоновых задач в БД (приложение tasks, воркер — run_tasks).
+# TASKS_EAGER выполняет задачу сразу после коммита, без воркера.
+TASKS_EAGER = False
+TASKS_MAX_ATTEMPTS = 5
+# Пауза перед повтором: TASKS_BACKOFF секунд, дальше удваивается.
+TASKS_BACKOFF = 10
+TASKS_BACKOFF_MAX = 60 * 60
+# Задачу, которую воркер держит дольше, считаем брошенной.
+TASKS_LOCK_TIMEOUT = 60 * 10